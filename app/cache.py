@@ -0,0 +1,172 @@
+"""
+Cache de resultados de análise endereçado por conteúdo.
+
+Dois níveis:
+- memória: LRU com limite de entradas, de bytes e TTL
+- disco (opcional): JSON comprimido com gzip em um diretório
+"""
+import asyncio
+import gzip
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import orjson
+
+from app.metrics import registry
+from app.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+CACHE_HITS = registry.counter("ocr_cache_hits_total", "Acertos no cache de resultados", ("tier",))
+CACHE_MISSES = registry.counter("ocr_cache_misses_total", "Falhas no cache de resultados")
+CACHE_BYTES = registry.gauge("ocr_cache_bytes", "Bytes mantidos no cache em memória")
+CACHE_ENTRIES = registry.gauge("ocr_cache_entries", "Entradas no cache em memória")
+CACHE_HIT_RATIO = registry.gauge("ocr_cache_hit_ratio", "Proporção de acertos no cache")
+
+# A cada quantas gravações em disco os arquivos expirados são removidos
+DISK_PRUNE_INTERVAL = 100
+
+
+class ResultCache:
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+
+        # chave -> (expira_em, tamanho, resultado)
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._disk_writes = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        CACHE_BYTES.set_function(lambda: self._bytes)
+        CACHE_ENTRIES.set_function(lambda: len(self._entries))
+        CACHE_HIT_RATIO.set_function(self.hit_ratio)
+
+    def hit_ratio(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self.hit_ratio(), 4)
+        }
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Busca na memória e, se configurado, no disco"""
+        value = self._get_memory(key)
+        if value is not None:
+            self._record_hit("memory")
+            return value
+
+        if self.disk_dir:
+            payload = await asyncio.to_thread(self._read_disk, key)
+            if payload is not None:
+                value = orjson.loads(payload)
+                self._set_memory(key, value, len(payload))
+                self._record_hit("disk")
+                return value
+
+        self._misses += 1
+        CACHE_MISSES.inc()
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        # orjson: o tamanho serializado é o custo em memória e o conteúdo do nível em disco
+        payload = dumps(value)
+        self._set_memory(key, value, len(payload))
+
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, payload)
+
+    def _record_hit(self, tier: str) -> None:
+        self._hits += 1
+        CACHE_HITS.inc(tier=tier)
+        logger.info(f"Cache hit ({tier}), taxa de acerto: {self.hit_ratio():.2%}, bytes: {self._bytes}")
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, size, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_memory(self, key: str, value: Dict[str, Any], size: int) -> None:
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self._bytes += size
+
+        # Remove as entradas menos usadas até respeitar os limites
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _disk_path(self, key: str) -> str:
+        filename = key.replace(":", "_")
+        return os.path.join(self.disk_dir, filename[:2], f"{filename}.json.gz")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._disk_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with gzip.open(path, "rb") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def _write_disk(self, key: str, payload: bytes) -> None:
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Falha ao gravar cache em disco: {str(e)}")
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % DISK_PRUNE_INTERVAL == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove arquivos expirados do cache em disco"""
+        now = time.time()
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if now - os.path.getmtime(path) > self.ttl:
+                        os.remove(path)
+                except OSError:
+                    pass
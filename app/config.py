@@ -7,18 +7,90 @@ class Settings:
     # Azure OCR
     DI_KEY = os.getenv("DI_KEY")
     DI_ENDPOINT = os.getenv("DI_ENDPOINT")
+    DI_POLLING_INTERVAL = float(os.getenv("DI_POLLING_INTERVAL", "1"))  # segundos entre consultas
+    # Vários recursos (separados por vírgula) para somar cotas; uma única chave vale para todos
+    DI_ENDPOINTS = [url.strip() for url in os.getenv("DI_ENDPOINTS", DI_ENDPOINT or "").split(",") if url.strip()]
+    DI_KEYS = [key.strip() for key in os.getenv("DI_KEYS", DI_KEY or "").split(",") if key.strip()]
+    ENDPOINT_THROTTLE_COOLDOWN = float(os.getenv("ENDPOINT_THROTTLE_COOLDOWN", "10"))  # segundos após 429 sem Retry-After
+    
+    # Pool de conexões HTTP com o Azure
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))  # conexões simultâneas
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))  # segundos ociosa no pool
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))  # segundos
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))  # segundos
+    
+    # Controle de admissão das chamadas ao Azure (por endpoint)
+    AZURE_MAX_CONCURRENCY = int(os.getenv("AZURE_MAX_CONCURRENCY", "16"))
+    AZURE_MAX_QUEUE = int(os.getenv("AZURE_MAX_QUEUE", "64"))
+    AZURE_RATE_LIMIT = float(os.getenv("AZURE_RATE_LIMIT", "15"))  # submissões/s (0 desativa)
+    AZURE_RATE_BURST = int(os.getenv("AZURE_RATE_BURST", "15"))
+    AZURE_RETRY_AFTER = int(os.getenv("AZURE_RETRY_AFTER", "1"))  # segundos sugeridos no 503
+    
+    # split_pages: blocos simultâneos por requisição (até AZURE_MAX_CONCURRENCY) e blocos por documento
+    SPLIT_MAX_CONCURRENCY = int(os.getenv("SPLIT_MAX_CONCURRENCY", "4"))
+    SPLIT_MAX_CHUNKS = int(os.getenv("SPLIT_MAX_CHUNKS", "16"))
+    
+    # Retentativas e circuit breaker (por endpoint)
+    AZURE_RETRY_MAX_ATTEMPTS = int(os.getenv("AZURE_RETRY_MAX_ATTEMPTS", "4"))
+    AZURE_RETRY_BASE_DELAY = float(os.getenv("AZURE_RETRY_BASE_DELAY", "0.5"))  # segundos
+    AZURE_RETRY_MAX_DELAY = float(os.getenv("AZURE_RETRY_MAX_DELAY", "20"))  # segundos
+    AZURE_REQUEST_DEADLINE = float(os.getenv("AZURE_REQUEST_DEADLINE", "120"))  # segundos por requisição
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))  # segundos
     
     # API
     API_TITLE = "Azure OCR API"
     API_VERSION = "1.0.0"
     API_HOST = "0.0.0.0"
     API_PORT = 8000
+    # Encerramento: tempo para jobs e análises em andamento terminarem
+    SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30"))  # segundos
     
     # CORS
     ALLOWED_ORIGINS = ["*"]  # Configure conforme necessário
     
     # Validação
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    SUPPORTED_FORMATS = ["image/jpeg", "image/png", "application/pdf"]
+    # Corpo máximo da requisição: arquivo em base64 (+33%) e margem para o JSON
+    MAX_REQUEST_SIZE = MAX_FILE_SIZE * 4 // 3 + 64 * 1024
+    
+    # Lote (/analyze/batch)
+    BATCH_MAX_DOCUMENTS = int(os.getenv("BATCH_MAX_DOCUMENTS", "500"))
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    BATCH_MAX_REQUEST_SIZE = int(os.getenv("BATCH_MAX_REQUEST_SIZE", str(100 * 1024 * 1024)))  # 100MB
+    # Formatos aceitos, identificados pelo conteúdo do arquivo
+    SUPPORTED_FORMATS = ["image/jpeg", "image/png", "image/tiff", "image/bmp", "image/heif", "application/pdf"]
+    
+    # Pré-processamento de imagens (requer Pillow)
+    PREPROCESS_ENABLED = os.getenv("PREPROCESS_ENABLED", "false").lower() == "true"
+    PREPROCESS_MAX_PIXELS = int(os.getenv("PREPROCESS_MAX_PIXELS", str(4_000_000)))  # ~2300x1700
+    PREPROCESS_QUALITY = int(os.getenv("PREPROCESS_QUALITY", "85"))  # qualidade JPEG
+    PREPROCESS_GRAYSCALE = os.getenv("PREPROCESS_GRAYSCALE", "true").lower() == "true"
+    PREPROCESS_MIN_BYTES = int(os.getenv("PREPROCESS_MIN_BYTES", str(1024 * 1024)))  # ignora imagens menores
+    PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", "2"))
+    
+    # Desserialização e processamento dos resultados do Azure (threads, fora do event loop)
+    RESULT_WORKERS = int(os.getenv("RESULT_WORKERS", "2"))
+    
+    # Jobs assíncronos (/jobs): ficam na memória do processo; no gunicorn
+    # (app/gunicorn_conf.py) vêm desativados e exigem WEB_CONCURRENCY=1
+    JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+    JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))  # segundos
+    JOB_MAX_STORED = int(os.getenv("JOB_MAX_STORED", "1000"))
+    
+    # Cache de resultados (chave: hash do arquivo + modelo)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 64MB
+    CACHE_TTL = float(os.getenv("CACHE_TTL", "3600"))  # segundos
+    CACHE_DIR = os.getenv("CACHE_DIR")  # ex.: logs/cache (desativado se vazio)
+    
+    # Armazenamento persistente de resultados (SQLite no volume de logs)
+    RESULT_STORE_ENABLED = os.getenv("RESULT_STORE_ENABLED", "false").lower() == "true"
+    RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "logs/results.db")
+    RESULT_STORE_RETENTION_DAYS = float(os.getenv("RESULT_STORE_RETENTION_DAYS", "30"))
+    RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))  # 1GB comprimido
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Balanceamento entre vários recursos do Document Intelligence: cada endpoint
+tem seu cliente, controle de admissão (cota própria) e circuit breaker; as
+chamadas vão para o endpoint disponível com menos requisições pendentes.
+"""
+import itertools
+import time
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from app.limiter import AdmissionController
+from app.metrics import registry
+from app.resilience import CircuitBreaker
+
+ENDPOINT_REQUESTS = registry.counter(
+    "ocr_endpoint_requests_total",
+    "Chamadas ao Azure por endpoint",
+    ("endpoint", "outcome")
+)
+ENDPOINT_OUTSTANDING = registry.gauge(
+    "ocr_endpoint_outstanding",
+    "Chamadas pendentes (na fila ou em andamento) por endpoint",
+    ("endpoint",)
+)
+ENDPOINT_THROTTLED = registry.counter(
+    "ocr_endpoint_throttled_total",
+    "Respostas 429 recebidas por endpoint",
+    ("endpoint",)
+)
+
+NO_ENDPOINTS_MESSAGE = "Nenhum endpoint do Azure configurado (DI_ENDPOINT ou DI_ENDPOINTS)"
+
+
+class Endpoint:
+    """Um recurso do Azure: URL, chave, cliente e estado de saúde"""
+
+    def __init__(self, url: str, key: str, limiter: AdmissionController, breaker: CircuitBreaker):
+        self.url = url
+        self.key = key
+        self.name = endpoint_name(url)
+        self.limiter = limiter
+        self.breaker = breaker
+        self.client = None
+        self.outstanding = 0
+        self.throttled_until = 0.0
+
+        ENDPOINT_OUTSTANDING.set_function(lambda: self.outstanding, endpoint=self.name)
+
+    @property
+    def throttled(self) -> bool:
+        return time.monotonic() < self.throttled_until
+
+    def throttle(self, seconds: float) -> None:
+        """Deixa de receber chamadas por alguns segundos (após 429)"""
+        self.throttled_until = max(self.throttled_until, time.monotonic() + seconds)
+        ENDPOINT_THROTTLED.inc(endpoint=self.name)
+
+
+def endpoint_name(url: str) -> str:
+    """Nome curto do endpoint para logs e métricas (host[:porta])"""
+    return urlparse(url).netloc or url
+
+
+class EndpointPool:
+    def __init__(self, endpoints: List[Endpoint]):
+        self.endpoints = endpoints
+        self._rotation = itertools.count()
+
+    def __iter__(self):
+        return iter(self.endpoints)
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def select(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        """
+        Escolhe o endpoint com menos chamadas pendentes entre os que não
+        estão com o circuito aberto nem em cooldown por 429. Empates são
+        resolvidos em rodízio. exclude evita repetir o endpoint que acabou
+        de falhar, se houver alternativa.
+        """
+        if not self.endpoints:
+            raise ValueError(NO_ENDPOINTS_MESSAGE)
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.breaker.is_available()]
+        healthy = [endpoint for endpoint in candidates if not endpoint.throttled]
+        # Todos indisponíveis: before_call/Retry-After decidem sobre o escolhido
+        candidates = healthy or candidates or self.endpoints
+        if exclude is not None and len(candidates) > 1:
+            candidates = [endpoint for endpoint in candidates if endpoint is not exclude] or candidates
+
+        offset = next(self._rotation)
+        count = len(candidates)
+        return min(
+            (candidates[(offset + index) % count] for index in range(count)),
+            key=lambda endpoint: endpoint.outstanding
+        )
@@ -0,0 +1,179 @@
+"""
+Extração declarativa dos campos dos modelos prebuilt: cada modelo tem um
+mapa (campo do Azure -> nome na resposta, com submapas para listas e
+objetos como Items), compilado uma vez na importação e aplicado em uma
+única passada sobre doc.fields.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+FieldMap = Dict[str, Union[str, Tuple[str, "FieldMap"]]]
+
+RECEIPT_ITEM_FIELDS: FieldMap = {
+    "Description": "description",
+    "Quantity": "quantity",
+    "QuantityUnit": "quantity_unit",
+    "Price": "price",
+    "ProductCode": "product_code",
+    "TotalPrice": "total_price",
+}
+
+INVOICE_ITEM_FIELDS: FieldMap = {
+    "Description": "description",
+    "Quantity": "quantity",
+    "Unit": "unit",
+    "UnitPrice": "unit_price",
+    "ProductCode": "product_code",
+    "Date": "date",
+    "Tax": "tax",
+    "TaxRate": "tax_rate",
+    "Amount": "amount",
+}
+
+FIELD_MAPS: Dict[str, FieldMap] = {
+    "prebuilt-receipt": {
+        "MerchantName": "merchant_name",
+        "MerchantAddress": "merchant_address",
+        "MerchantPhoneNumber": "merchant_phone",
+        "TransactionDate": "transaction_date",
+        "TransactionTime": "transaction_time",
+        "Items": ("items", RECEIPT_ITEM_FIELDS),
+        "Subtotal": "subtotal",
+        "TotalTax": "tax",
+        "TaxDetails": ("tax_details", {"Amount": "amount", "NetAmount": "net_amount", "Rate": "rate", "Description": "description"}),
+        "Tip": "tip",
+        "Total": "total",
+    },
+    "prebuilt-invoice": {
+        "InvoiceId": "invoice_id",
+        "InvoiceDate": "invoice_date",
+        "DueDate": "due_date",
+        "PurchaseOrder": "purchase_order",
+        "VendorName": "vendor_name",
+        "VendorAddress": "vendor_address",
+        "VendorAddressRecipient": "vendor_address_recipient",
+        "VendorTaxId": "vendor_tax_id",
+        "CustomerName": "customer_name",
+        "CustomerId": "customer_id",
+        "CustomerAddress": "customer_address",
+        "CustomerAddressRecipient": "customer_address_recipient",
+        "CustomerTaxId": "customer_tax_id",
+        "BillingAddress": "billing_address",
+        "ShippingAddress": "shipping_address",
+        "Items": ("items", INVOICE_ITEM_FIELDS),
+        "SubTotal": "subtotal",
+        "TotalTax": "tax",
+        "InvoiceTotal": "total",
+        "AmountDue": "amount_due",
+        "PreviousUnpaidBalance": "previous_unpaid_balance",
+        "PaymentTerm": "payment_term",
+        "ServiceStartDate": "service_start_date",
+        "ServiceEndDate": "service_end_date",
+    },
+    "prebuilt-businessCard": {
+        "ContactNames": ("contact_names", {"FirstName": "first_name", "LastName": "last_name"}),
+        "CompanyNames": "company_names",
+        "JobTitles": "job_titles",
+        "Departments": "departments",
+        "Emails": "emails",
+        "Websites": "websites",
+        "MobilePhones": "mobile_phones",
+        "WorkPhones": "work_phones",
+        "Faxes": "faxes",
+        "OtherPhones": "other_phones",
+        "Addresses": "addresses",
+    },
+    "prebuilt-idDocument": {
+        "FirstName": "first_name",
+        "LastName": "last_name",
+        "DocumentNumber": "document_number",
+        "DateOfBirth": "date_of_birth",
+        "DateOfExpiration": "date_of_expiration",
+        "DateOfIssue": "date_of_issue",
+        "Sex": "sex",
+        "Address": "address",
+        "CountryRegion": "country_region",
+        "Region": "region",
+        "Nationality": "nationality",
+        "PlaceOfBirth": "place_of_birth",
+    },
+}
+
+
+class CompiledField(NamedTuple):
+    name: str
+    children: Optional[Dict[str, "CompiledField"]]
+
+
+def compile_field_map(field_map: FieldMap) -> Dict[str, CompiledField]:
+    """Converte o mapa declarativo na estrutura usada na extração"""
+    compiled = {}
+    for azure_name, spec in field_map.items():
+        if isinstance(spec, tuple):
+            name, children = spec
+            compiled[azure_name] = CompiledField(name, compile_field_map(children))
+        else:
+            compiled[azure_name] = CompiledField(spec, None)
+    return compiled
+
+
+COMPILED_FIELD_MAPS = {model: compile_field_map(field_map) for model, field_map in FIELD_MAPS.items()}
+
+
+@lru_cache(maxsize=1024)
+def snake_case(name: str) -> str:
+    """Nome de campo não mapeado: MachineReadableZone -> machine_readable_zone"""
+    name = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", name)
+    return re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", name).lower()
+
+
+# Conversão dos valores que não são JSON nativo, por value_type
+VALUE_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "currency": lambda value: value.amount,
+    "address": lambda value: {key: part for key, part in value.to_dict().items() if part is not None},
+}
+
+
+def convert_field(field, children: Optional[Dict[str, CompiledField]] = None) -> Optional[Dict[str, Any]]:
+    """Converte um DocumentField em {"value", "confidence"}, recursivamente em listas e objetos"""
+    if field is None:
+        return None
+
+    value_type = field.value_type
+    value = field.value
+    if value is None:
+        pass
+    elif value_type == "list":
+        value = [convert_field(item, children) for item in value]
+    elif value_type == "dictionary":
+        value = extract_fields(value, children)
+    else:
+        converter = VALUE_CONVERTERS.get(value_type)
+        if converter is not None:
+            value = converter(value)
+
+    return {"value": value, "confidence": field.confidence}
+
+
+def extract_fields(fields: Dict[str, Any], compiled: Optional[Dict[str, CompiledField]]) -> Dict[str, Any]:
+    """
+    Uma passada sobre os campos: mapeados recebem o nome do mapa,
+    os demais são mantidos em snake_case
+    """
+    extracted = {}
+    for azure_name, field in fields.items():
+        spec = compiled.get(azure_name) if compiled else None
+        if spec is None:
+            extracted[snake_case(azure_name)] = convert_field(field)
+        else:
+            extracted[spec.name] = convert_field(field, spec.children)
+    return extracted
+
+
+def extract_document(result, model: str) -> Dict[str, Any]:
+    """Campos do primeiro documento do resultado, conforme o mapa do modelo"""
+    if not result.documents:
+        return {}
+    doc = result.documents[0]
+    return extract_fields(doc.fields or {}, COMPILED_FIELD_MAPS.get(model))
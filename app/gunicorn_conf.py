@@ -0,0 +1,79 @@
+"""
+Configuração do gunicorn para produção (docker/Dockerfile):
+
+    gunicorn app.main:app -c app/gunicorn_conf.py
+
+Um worker uvicorn (uvloop + httptools) por CPU disponível, ou
+WEB_CONCURRENCY; a aplicação é importada no processo mestre antes do
+fork (preload), junto com o SDK do Azure, e cada worker só abre seus
+clientes do Azure no lifespan.
+Os jobs (/jobs) ficam na memória do worker que os recebeu, e a consulta
+pode cair em outro worker: aqui eles vêm desativados (JOBS_ENABLED=false)
+e só podem ser ativados com um único worker (WEB_CONCURRENCY=1).
+No SIGTERM os workers param de aceitar conexões, concluem as requisições
+abertas e aguardam as análises em andamento e, com jobs, os que estão na
+fila do processo (SHUTDOWN_DRAIN_TIMEOUT); o que não terminar é perdido.
+"""
+import math
+import os
+
+from uvicorn.workers import UvicornWorker
+
+# Vários workers por padrão: jobs são opcionais (lido antes de app.config)
+os.environ.setdefault("JOBS_ENABLED", "false")
+
+from app.config import settings
+
+
+def cpu_count() -> int:
+    """CPUs disponíveis ao processo, respeitando afinidade e cota do cgroup (containers)"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    # cgroup v2: "max 100000" (sem limite) ou "<cota> <período>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+class ProductionWorker(UvicornWorker):
+    # Explícito em vez de "auto": falha na inicialização se uvloop/httptools faltarem
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "timeout_graceful_shutdown": settings.SHUTDOWN_DRAIN_TIMEOUT,
+    }
+
+
+bind = os.getenv("BIND", f"{settings.API_HOST}:{settings.API_PORT}")
+workers = int(os.getenv("WEB_CONCURRENCY", "0")) or cpu_count()
+if settings.JOBS_ENABLED and workers > 1:
+    # GET /jobs/{id} em outro worker responderia 404: jobs exigem um processo só
+    raise RuntimeError(
+        f"JOBS_ENABLED=true exige um único worker ({workers} configurados): "
+        "defina WEB_CONCURRENCY=1 ou JOBS_ENABLED=false"
+    )
+worker_class = "app.gunicorn_conf.ProductionWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+
+# Requisições abertas e, depois, jobs e análises: até duas vezes o dreno
+graceful_timeout = int(2 * settings.SHUTDOWN_DRAIN_TIMEOUT) + 5
+# Sem heartbeat por mais que isso o worker é reiniciado (análises longas não bloqueiam o loop)
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+accesslog = "-" if os.getenv("ACCESS_LOG", "false").lower() == "true" else None
+
+
+def when_ready(server) -> None:
+    if preload_app:
+        # SDK do Azure importado uma vez no mestre e compartilhado pelos workers
+        from app.ocr_service import load_azure_sdk
+        load_azure_sdk()
+    server.log.info(f"Iniciando {workers} worker(s) em {bind}" + (" com preload da aplicação" if preload_app else ""))
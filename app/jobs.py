@@ -0,0 +1,154 @@
+"""
+Jobs assíncronos de análise: o cliente envia o documento, recebe um id e
+consulta o resultado depois, sem manter a conexão aberta durante a análise.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.metrics import registry
+from app.models import AnalysisOptions, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOBS_SUBMITTED = registry.counter("ocr_jobs_submitted_total", "Jobs aceitos")
+JOBS_FINISHED = registry.counter("ocr_jobs_finished_total", "Jobs finalizados", ("status",))
+JOBS_QUEUE_DEPTH = registry.gauge("ocr_jobs_queue_depth", "Jobs aguardando um worker")
+
+
+class JobQueueFullError(Exception):
+    """Fila de jobs cheia"""
+
+
+class Job:
+    def __init__(self, file_data: bytes, model: str, options: Optional[AnalysisOptions] = None):
+        self.job_id = uuid.uuid4().hex
+        self.model = model
+        self.options = options
+        self.status = JobStatus.PENDING
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.file_data: Optional[bytes] = file_data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "model": self.model,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobManager:
+    def __init__(self, service, workers: int, queue_size: int, result_ttl: float, max_jobs: int):
+        self.service = service
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+
+        self._queue: "asyncio.Queue[Job]" = asyncio.Queue(maxsize=queue_size)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._draining = False
+
+        JOBS_QUEUE_DEPTH.set_function(self._queue.qsize)
+
+    async def start(self) -> None:
+        """Inicia o pool de workers"""
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Pool de jobs iniciado com {self.workers} workers")
+
+    async def stop(self, timeout: float = 0) -> None:
+        """
+        Para de aceitar jobs, aguarda por até timeout segundos os jobs na
+        fila e em andamento e cancela os workers
+        """
+        self._draining = True
+        pending = self._queue.qsize() + self._running
+        if timeout > 0 and self._tasks and pending:
+            logger.info(f"Aguardando {pending} job(s) antes de encerrar")
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Encerrando com {self._queue.qsize() + self._running} job(s) não concluído(s)")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, file_data: bytes, model: str, options: Optional[AnalysisOptions] = None) -> Job:
+        """Enfileira um job; levanta JobQueueFullError se a fila estiver cheia"""
+        if self._draining:
+            raise JobQueueFullError("Servidor em encerramento, tente novamente")
+        self._evict()
+
+        job = Job(file_data, getattr(model, "value", model), options)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Fila de jobs cheia, tente novamente mais tarde")
+
+        self._jobs[job.job_id] = job
+        JOBS_SUBMITTED.inc()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._evict()
+        return self._jobs.get(job_id)
+
+    def _evict(self) -> None:
+        """Remove jobs finalizados expirados e, acima do limite, os mais antigos"""
+        now = time.time()
+        finished = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None
+        ]
+
+        for job_id in finished:
+            if now - self._jobs[job_id].finished_at > self.result_ttl:
+                del self._jobs[job_id]
+
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in finished:
+            if excess <= 0:
+                break
+            if job_id in self._jobs:
+                del self._jobs[job_id]
+                excess -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            try:
+                await self._run(job)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        try:
+            result = await self.service.analyze_document(job.file_data, job.model, job.options)
+            job.result = result
+            job.status = JobStatus.COMPLETED if result["success"] else JobStatus.FAILED
+            job.error = result.get("error")
+        except Exception as e:
+            logger.error(f"Erro no job {job.job_id}: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = f"Erro interno: {str(e)}"
+        finally:
+            # O arquivo não é mais necessário após a análise
+            job.file_data = None
+            job.finished_at = time.time()
+            JOBS_FINISHED.inc(status=job.status.value)
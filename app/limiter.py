@@ -0,0 +1,97 @@
+"""
+Controle de admissão das chamadas ao Azure: limite de concorrência,
+token bucket (TPS) e fila de espera limitada com rejeição rápida.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from app.metrics import registry
+
+ADMISSION_WAITING = registry.gauge("ocr_admission_queue_depth", "Chamadas aguardando vaga para o Azure", ("endpoint",))
+ADMISSION_ACTIVE = registry.gauge("ocr_admission_active", "Chamadas ao Azure em andamento", ("endpoint",))
+ADMISSION_WAIT = registry.histogram("ocr_admission_wait_seconds", "Tempo de espera na fila de admissão", ("endpoint",))
+ADMISSION_REJECTED = registry.counter("ocr_admission_rejected_total", "Chamadas rejeitadas com fila cheia", ("endpoint",))
+
+
+class ServiceUnavailableError(Exception):
+    """Serviço temporariamente indisponível; o cliente deve tentar após retry_after segundos"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket para limitar a taxa de submissões (requisições por segundo)"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int, max_queue: int, rate: float = 0, burst: int = 1,
+                 retry_after: float = 1, name: str = "default"):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket: Optional[TokenBucket] = TokenBucket(rate, burst) if rate > 0 else None
+        self._waiting = 0
+        self._active = 0
+
+        ADMISSION_WAITING.set_function(lambda: self._waiting, endpoint=name)
+        ADMISSION_ACTIVE.set_function(lambda: self._active, endpoint=name)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Reserva uma vaga para uma operação no Azure. Levanta
+        ServiceUnavailableError se a fila de espera estiver cheia.
+        """
+        if self._waiting >= self.max_queue and (self._waiting > 0 or self._semaphore.locked()):
+            ADMISSION_REJECTED.inc(endpoint=self.name)
+            raise ServiceUnavailableError(
+                "Serviço sobrecarregado, tente novamente mais tarde",
+                retry_after=self.retry_after
+            )
+
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+        ADMISSION_WAIT.observe(time.perf_counter() - start, endpoint=self.name)
+
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
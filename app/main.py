@@ -1,23 +1,93 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import FastAPI, HTTPException, Query, Request, Response, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
 import logging
+import math
+import time
+from typing import Optional, Tuple
 import uvicorn
 
 from app.config import settings
-from app.models import AnalysisRequest, AnalysisResponse, HealthResponse, ModelsResponse
+from app.jobs import JobManager, JobQueueFullError
+from app.limiter import ServiceUnavailableError
+from app.metrics import BYTES_OUT, STAGE_DURATION, observe_stage, registry
+from app.middleware import BodySizeLimitMiddleware
+from app.models import (
+    AnalysisOptions,
+    AnalysisRequest,
+    AnalysisResponse,
+    BatchAnalysisRequest,
+    BatchItemResponse,
+    HealthResponse,
+    JobResponse,
+    LayoutFormat,
+    ModelsResponse,
+    OCRModel,
+    RawResponseMode,
+    ReadyResponse,
+    StoredResultListResponse,
+    StoredResultResponse,
+    StoredResultSummary,
+)
 from app.ocr_service import AzureOCRService
-from app.utils import decode_base64_file, validate_file_size
+from app.serialization import FastJSONResponse, dumps, response_payload
+from app.utils import (
+    FileTooLargeError, UnsupportedFileTypeError, check_mime_type, decode_base64_file,
+    iter_upload_file, matches_file_type, read_limited, validate_file_size
+)
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Inicializar serviço OCR e pool de jobs
+ocr_service = AzureOCRService()
+job_manager = JobManager(
+    ocr_service,
+    workers=settings.JOB_WORKERS,
+    queue_size=settings.JOB_QUEUE_SIZE,
+    result_ttl=settings.JOB_RESULT_TTL,
+    max_jobs=settings.JOB_MAX_STORED
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicialização e encerramento da aplicação"""
+    try:
+        await ocr_service.start()
+    except ValueError as e:
+        # Sem credenciais a API sobe mesmo assim: /health responde e /ready indica o motivo
+        logger.error(f"Clientes do Azure não iniciados: {str(e)}")
+    if settings.JOBS_ENABLED:
+        await job_manager.start()
+    yield
+    # O servidor já parou de aceitar conexões e concluiu as requisições
+    # abertas; os jobs deste processo e as análises em andamento têm
+    # SHUTDOWN_DRAIN_TIMEOUT (jobs não concluídos são perdidos)
+    deadline = time.monotonic() + settings.SHUTDOWN_DRAIN_TIMEOUT
+    await job_manager.stop(settings.SHUTDOWN_DRAIN_TIMEOUT)
+    await ocr_service.drain(deadline - time.monotonic())
+    await ocr_service.close()
+
 # Criar app FastAPI
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
-    description="API para análise de documentos usando Azure OCR"
+    description="API para análise de documentos usando Azure OCR",
+    lifespan=lifespan
+)
+
+# Limitar tamanho do corpo das requisições antes da leitura completa
+# (registrado antes do CORS, que fica por fora e também cobre as respostas 413)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=settings.MAX_REQUEST_SIZE,
+    path_limits={"/analyze/batch": settings.BATCH_MAX_REQUEST_SIZE}
 )
 
 # Configurar CORS
@@ -29,9 +99,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Inicializar serviço OCR
-ocr_service = AzureOCRService()
-
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Endpoint de health check"""
@@ -41,6 +108,18 @@ async def health_check():
         version=settings.API_VERSION
     )
 
+@app.get("/ready", response_model=ReadyResponse, responses={503: {"model": ReadyResponse}})
+async def readiness_check():
+    """
+    Prontidão para tráfego (readiness probe): 503 sem credenciais, antes
+    do startup ou com o circuito aberto em todos os endpoints do Azure
+    """
+    readiness = ocr_service.readiness()
+    return FastJSONResponse(
+        readiness,
+        status_code=status.HTTP_200_OK if readiness["ready"] else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
 @app.get("/models", response_model=ModelsResponse)
 async def list_models():
     """Lista modelos disponíveis"""
@@ -51,16 +130,86 @@ async def list_models():
             "prebuilt-layout", 
             "prebuilt-businessCard",
             "prebuilt-idDocument",
-            "prebuilt-read"
+            "prebuilt-read",
+            "auto"
         ]
     )
 
-@app.post("/analyze", response_model=AnalysisResponse)
-async def analyze_document(request: AnalysisRequest):
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas no formato Prometheus"""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+def _analysis_response(result: dict, model: str) -> Response:
+    """Serializa o resultado da análise (orjson, sem revalidar) medindo tempo e bytes"""
+    with observe_stage("response_serialize", model):
+        body = dumps(response_payload(AnalysisResponse, result))
+    BYTES_OUT.inc(len(body), model=model)
+    return Response(content=body, media_type="application/json")
+
+def _validation_error(error: ValidationError, location: str) -> RequestValidationError:
+    """
+    Erro 422 no formato das rotas validadas pelo FastAPI: loc começa pela
+    origem do campo ("body" ou "query")
+    """
+    return RequestValidationError([
+        {**detail, "loc": (location, *detail["loc"])} for detail in error.errors()
+    ])
+
+def _decode_request_file(request: AnalysisRequest) -> Tuple[bytes, str]:
+    """
+    Decodifica o file_data em base64 (rejeita arquivos grandes antes de
+    decodificar), convertendo as falhas em 413, 415 ou 400
+    """
+    try:
+        with observe_stage("base64_decode", request.model.value):
+            return decode_base64_file(request.file_data, settings.MAX_FILE_SIZE, settings.SUPPORTED_FORMATS)
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+    except UnsupportedFileTypeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@app.post(
+    "/analyze",
+    response_model=AnalysisResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"$ref": "#/components/schemas/AnalysisRequest"}}
+            }
+        }
+    }
+)
+async def analyze_document(http_request: Request):
     """
     Analisa documento usando Azure OCR
     """
     try:
+        # Ler e validar o corpo (medido separadamente do restante)
+        parse_start = time.perf_counter()
+        try:
+            request = AnalysisRequest.model_validate_json(await http_request.body())
+        except ValidationError as e:
+            STAGE_DURATION.observe(time.perf_counter() - parse_start, stage="request_parse", model="unknown", outcome="error")
+            raise _validation_error(e, "body")
+        model = request.model.value
+        STAGE_DURATION.observe(time.perf_counter() - parse_start, stage="request_parse", model=model, outcome="success")
+        
         # Validar entrada
         if not request.file_data:
             raise HTTPException(
@@ -68,14 +217,7 @@ async def analyze_document(request: AnalysisRequest):
                 detail="file_data é obrigatório"
             )
         
-        # Decodificar base64
-        try:
-            file_data, mime_type = decode_base64_file(request.file_data)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e)
-            )
+        file_data, mime_type = _decode_request_file(request)
         
         # Validar tamanho do arquivo
         if not validate_file_size(file_data, settings.MAX_FILE_SIZE):
@@ -84,14 +226,96 @@ async def analyze_document(request: AnalysisRequest):
                 detail=f"Arquivo muito grande. Máximo: {settings.MAX_FILE_SIZE} bytes"
             )
         
+        _warn_file_type_mismatch(mime_type, request.file_type)
         logger.info(f"Processando arquivo: {mime_type}, modelo: {request.model}")
         
         # Processar com Azure OCR
-        result = await ocr_service.analyze_document(file_data, request.model)
+        result = await ocr_service.analyze_document(file_data, model, request.options)
+        
+        return _analysis_response(result, model)
+        
+    except (HTTPException, RequestValidationError, ServiceUnavailableError):
+        raise
+    except Exception as e:
+        logger.error(f"Erro inesperado: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro interno: {str(e)}"
+        )
+
+@app.post(
+    "/analyze/upload",
+    response_model=AnalysisResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                },
+                "application/octet-stream": {
+                    "schema": {"type": "string", "format": "binary"}
+                }
+            }
+        }
+    }
+)
+async def analyze_upload(
+    request: Request,
+    model: OCRModel,
+    raw_response: RawResponseMode = RawResponseMode.FULL,
+    pages: Optional[str] = None,
+    split_pages: Optional[int] = None,
+    layout_format: LayoutFormat = LayoutFormat.OBJECTS
+):
+    """
+    Analisa documento enviado como binário (multipart/form-data ou
+    application/octet-stream), sem passar por base64
+    """
+    try:
+        content_type = request.headers.get("content-type", "")
+        
+        try:
+            with observe_stage("request_parse", model.value):
+                file_data, mime_type = await _read_upload(request, content_type)
+        except FileTooLargeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=str(e)
+            )
+        
+        if not file_data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Arquivo vazio"
+            )
+        
+        # Tipo identificado pelo conteúdo, não pelo Content-Type informado
+        try:
+            mime_type = check_mime_type(file_data, settings.SUPPORTED_FORMATS)
+        except UnsupportedFileTypeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=str(e)
+            )
+        
+        logger.info(f"Processando upload: {mime_type}, modelo: {model}")
         
-        return AnalysisResponse(**result)
+        try:
+            options = AnalysisOptions(
+                raw_response=raw_response, pages=pages, split_pages=split_pages, layout_format=layout_format
+            )
+        except ValidationError as e:
+            raise _validation_error(e, "query")
+        result = await ocr_service.analyze_document(file_data, model, options)
         
-    except HTTPException:
+        return _analysis_response(result, model.value)
+        
+    except (HTTPException, RequestValidationError, ServiceUnavailableError):
         raise
     except Exception as e:
         logger.error(f"Erro inesperado: {str(e)}")
@@ -100,6 +324,226 @@ async def analyze_document(request: AnalysisRequest):
             detail=f"Erro interno: {str(e)}"
         )
 
+def _warn_file_type_mismatch(mime_type: str, file_type) -> None:
+    """Registra aviso quando o conteúdo não corresponde ao file_type declarado"""
+    if not matches_file_type(mime_type, file_type):
+        logger.warning(f"file_type '{getattr(file_type, 'value', file_type)}' não corresponde ao conteúdo detectado: {mime_type}")
+
+async def _read_upload(request: Request, content_type: str):
+    """Lê o arquivo do corpo multipart ou binário, limitado a MAX_FILE_SIZE"""
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Campo 'file' é obrigatório"
+            )
+        try:
+            return await read_limited(iter_upload_file(upload), settings.MAX_FILE_SIZE), upload.content_type
+        finally:
+            await form.close()
+    
+    mime_type = content_type or "application/octet-stream"
+    return await read_limited(request.stream(), settings.MAX_FILE_SIZE), mime_type
+
+async def _analyze_batch_item(index: int, document: AnalysisRequest) -> dict:
+    """Analisa um documento do lote; erros viram resultado com success=False"""
+    start_time = time.perf_counter()
+    try:
+        file_data, mime_type = decode_base64_file(document.file_data, settings.MAX_FILE_SIZE, settings.SUPPORTED_FORMATS)
+        _warn_file_type_mismatch(mime_type, document.file_type)
+        result = await ocr_service.analyze_document(file_data, document.model, document.options)
+    except ValueError as e:
+        result = {
+            "success": False,
+            "error": str(e),
+            "processing_time": time.perf_counter() - start_time
+        }
+    except Exception as e:
+        logger.error(f"Erro no item {index} do lote: {str(e)}")
+        result = {
+            "success": False,
+            "error": f"Erro interno: {str(e)}",
+            "processing_time": time.perf_counter() - start_time
+        }
+    return {**result, "index": index}
+
+@app.post(
+    "/analyze/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "Um BatchItemResponse por linha"}}
+)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analisa um lote de documentos em paralelo (com limite de concorrência).
+    Os resultados são enviados em NDJSON, na ordem em que ficam prontos.
+    """
+    if len(request.documents) > settings.BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote muito grande. Máximo: {settings.BATCH_MAX_DOCUMENTS} documentos"
+        )
+    
+    concurrency = min(request.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+    logger.info(f"Processando lote: {len(request.documents)} documentos, concorrência: {concurrency}")
+    
+    async def run_item(index: int, document: AnalysisRequest) -> dict:
+        async with semaphore:
+            return await _analyze_batch_item(index, document)
+    
+    async def stream_results():
+        tasks = [
+            asyncio.ensure_future(run_item(index, document))
+            for index, document in enumerate(request.documents)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                item = await next_result
+                model = request.documents[item["index"]].model.value
+                with observe_stage("response_serialize", model):
+                    line = dumps(response_payload(BatchItemResponse, item)) + b"\n"
+                BYTES_OUT.inc(len(line), model=model)
+                yield line
+        finally:
+            # Cliente desconectou: cancela o que ainda não terminou
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.post(
+    "/analyze/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "Eventos metadata/page/table/end, um por linha"}}
+)
+async def analyze_stream(request: AnalysisRequest):
+    """
+    Analisa documento e envia páginas e tabelas incrementalmente em NDJSON,
+    sem montar a resposta inteira em memória (indicado para PDFs grandes)
+    """
+    file_data, mime_type = _decode_request_file(request)
+    
+    model = request.model.value
+    _warn_file_type_mismatch(mime_type, request.file_type)
+    logger.info(f"Processando arquivo (streaming): {mime_type}, modelo: {model}")
+    events = await ocr_service.analyze_stream(file_data, model, request.options)
+    
+    def stream_events():
+        for event in events:
+            line = dumps(event) + b"\n"
+            BYTES_OUT.inc(len(line), model=model)
+            yield line
+    
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
+
+def _job_payload(job) -> dict:
+    payload = response_payload(JobResponse, job.to_dict())
+    if job.result is not None:
+        payload["result"] = response_payload(AnalysisResponse, job.result)
+    return payload
+
+def _job_manager() -> JobManager:
+    if not settings.JOBS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Jobs desativados (JOBS_ENABLED)"
+        )
+    return job_manager
+
+@app.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(request: AnalysisRequest):
+    """
+    Envia documento para análise em background e retorna o id do job
+    """
+    jobs = _job_manager()
+    file_data, mime_type = _decode_request_file(request)
+    
+    try:
+        job = jobs.submit(file_data, request.model, request.options)
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    _warn_file_type_mismatch(mime_type, request.file_type)
+    logger.info(f"Job {job.job_id} criado: {mime_type}, modelo: {request.model}")
+    return FastJSONResponse(_job_payload(job), status_code=status.HTTP_202_ACCEPTED)
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Consulta status e resultado de um job
+    """
+    job = _job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado ou expirado"
+        )
+    return FastJSONResponse(_job_payload(job))
+
+def _result_store():
+    if ocr_service.store is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Armazenamento de resultados desativado (RESULT_STORE_ENABLED)"
+        )
+    return ocr_service.store
+
+@app.get("/results", response_model=StoredResultListResponse)
+async def list_results(
+    model: Optional[str] = None,
+    document_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0)
+):
+    """
+    Lista os resultados armazenados, do mais recente ao mais antigo,
+    filtrando por modelo, tipo de documento e data
+    """
+    results = await _result_store().search(
+        model=model,
+        document_type=document_type,
+        since=since.timestamp() if since else None,
+        until=until.timestamp() if until else None,
+        limit=limit,
+        offset=offset
+    )
+    return FastJSONResponse({
+        "results": [response_payload(StoredResultSummary, item) for item in results],
+        "limit": limit,
+        "offset": offset
+    })
+
+@app.get("/results/{content_hash}", response_model=StoredResultResponse)
+async def get_result(content_hash: str, model: Optional[str] = None):
+    """
+    Resultado armazenado mais recente de um documento (hash SHA-256 do
+    conteúdo), sem nova chamada ao Azure
+    """
+    stored = await _result_store().latest(content_hash.lower(), model)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resultado não encontrado"
+        )
+    stored["result"] = response_payload(AnalysisResponse, stored["result"])
+    return FastJSONResponse(stored)
+
+@app.exception_handler(ServiceUnavailableError)
+async def service_unavailable_handler(request, exc: ServiceUnavailableError):
+    """Sobrecarga: 503 com Retry-After para o cliente aguardar"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Handler global de exceções"""
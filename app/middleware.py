@@ -0,0 +1,72 @@
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejeita com 413 requisições cujo corpo excede o limite, antes de
+    ler o payload inteiro para a memória
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_body_size = max_body_size
+        # Limites específicos por rota (ex.: lotes)
+        self.path_limits = path_limits or {}
+
+    def _too_large(self, max_body_size: int) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Requisição muito grande. Máximo: {max_body_size} bytes"
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_body_size = self.path_limits.get(scope["path"], self.max_body_size)
+
+        # Rejeição imediata pelo Content-Length declarado
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = 0
+                if content_length > max_body_size:
+                    error = self._too_large(max_body_size)
+                    response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+                    await response(scope, receive, send)
+                    return
+                break
+
+        # Contagem dos bytes recebidos (chunked ou Content-Length incorreto)
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    raise self._too_large(max_body_size)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as error:
+            if response_started or error.status_code != status.HTTP_413_REQUEST_ENTITY_TOO_LARGE:
+                raise
+            response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+            await response(scope, receive, send)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
@@ -13,26 +13,111 @@ class OCRModel(str, Enum):
     BUSINESS_CARD = "prebuilt-businessCard"
     ID_DOCUMENT = "prebuilt-idDocument"
     READ = "prebuilt-read"
+    AUTO = "auto"  # prebuilt-read, escalando para receipt/invoice/layout se necessário
+
+class RawResponseMode(str, Enum):
+    FULL = "full"        # result.to_dict() completo
+    COMPACT = "compact"  # sem polígonos, spans e palavras
+    NONE = "none"        # sem raw_response
+
+class LayoutFormat(str, Enum):
+    OBJECTS = "objects"  # um objeto por linha e por célula
+    COMPACT = "compact"  # linhas em arrays paralelos, tabelas em matrizes por linha
+
+class AnalysisOptions(BaseModel):
+    # Outras chaves são aceitas e ignoradas (compatibilidade)
+    model_config = ConfigDict(extra="allow")
+    
+    raw_response: RawResponseMode = Field(default=RawResponseMode.FULL, description="Conteúdo do raw_response")
+    pages: Optional[str] = Field(
+        default=None,
+        pattern=r"^\s*\d+(\s*-\s*\d+)?(\s*,\s*\d+(\s*-\s*\d+)?)*\s*$",
+        description="Páginas a analisar, ex.: \"1-3,5\""
+    )
+    split_pages: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Divide PDFs grandes em blocos de N páginas analisados em paralelo (layout/read)"
+    )
+    preprocess: Optional[bool] = Field(
+        default=None,
+        description="Reduz/recodifica imagens antes do envio (padrão: PREPROCESS_ENABLED)"
+    )
+    layout_format: LayoutFormat = Field(
+        default=LayoutFormat.OBJECTS,
+        description="Formato de páginas e tabelas em extracted_data (layout/read)"
+    )
 
 class AnalysisRequest(BaseModel):
     file_data: str = Field(..., description="Arquivo em base64")
     file_type: FileType = Field(..., description="Tipo do arquivo")
     model: OCRModel = Field(..., description="Modelo OCR a usar")
-    options: Optional[Dict[str, Any]] = Field(default={}, description="Opções adicionais")
+    options: Optional[AnalysisOptions] = Field(default_factory=AnalysisOptions, description="Opções adicionais")
 
 class AnalysisResponse(BaseModel):
     success: bool
+    model: Optional[str] = None  # modelo efetivamente usado (relevante para "auto")
     document_type: Optional[str] = None
     confidence: Optional[float] = None
     extracted_data: Optional[Dict[str, Any]] = None
     raw_response: Optional[Dict[str, Any]] = None
     processing_time: float
     error: Optional[str] = None
+    cached: bool = False
+
+class BatchAnalysisRequest(BaseModel):
+    documents: List[AnalysisRequest] = Field(..., min_length=1, description="Documentos a analisar")
+    max_concurrency: Optional[int] = Field(default=None, ge=1, description="Máximo de análises simultâneas")
+
+class BatchItemResponse(AnalysisResponse):
+    index: int
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    model: str
+    created_at: float
+    finished_at: Optional[float] = None
+    result: Optional[AnalysisResponse] = None
+    error: Optional[str] = None
+
+class StoredResultSummary(BaseModel):
+    hash: str
+    model: str
+    document_type: Optional[str] = None
+    confidence: Optional[float] = None
+    created_at: float
+    size: int  # bytes comprimidos
+
+class StoredResultResponse(StoredResultSummary):
+    result: AnalysisResponse
+
+class StoredResultListResponse(BaseModel):
+    results: List[StoredResultSummary]
+    limit: int
+    offset: int
 
 class HealthResponse(BaseModel):
     status: str
     service: str
     version: str
 
+class EndpointStatus(BaseModel):
+    endpoint: str
+    circuit: str  # closed, half_open, open
+    throttled: bool
+    outstanding: int
+
+class ReadyResponse(BaseModel):
+    ready: bool
+    reason: Optional[str] = None
+    endpoints: List[EndpointStatus]
+
 class ModelsResponse(BaseModel):
     available_models: List[str]
\ No newline at end of file
@@ -1,120 +1,678 @@
+import asyncio
 import time
 import logging
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
-from azure.core.exceptions import AzureError
+from concurrent.futures import ThreadPoolExecutor
+from app.cache import ResultCache
 from app.config import settings
-from app.utils import create_file_object
-from typing import Dict, Any, Optional
+from app.endpoints import ENDPOINT_REQUESTS, NO_ENDPOINTS_MESSAGE, Endpoint, EndpointPool, endpoint_name
+from app.extraction import FIELD_MAPS, extract_document
+from app.limiter import AdmissionController, ServiceUnavailableError
+from app.metrics import BYTES_IN, observe_stage, registry
+from app.models import AnalysisOptions, LayoutFormat, RawResponseMode
+from app.preprocessing import ImagePreprocessor
+from app.resilience import CircuitBreaker, RetryPolicy
+from app.routing import (
+    AUTO_MODEL, READ_MODEL, ROUTING_DECISIONS, ROUTING_ESCALATION_OVERHEAD,
+    ROUTING_LATENCY_SAVED, LatencyTracker, classify_document
+)
+from app.store import ResultStore
+from app.utils import content_hash, count_pdf_pages, create_file_object
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Modelos cujo resultado pode ser dividido por páginas e recombinado
+SPLITTABLE_MODELS = ("prebuilt-layout", "prebuilt-read")
+
+COALESCED_REQUESTS = registry.counter(
+    "ocr_coalesced_requests_total",
+    "Requisições atendidas por uma análise idêntica já em andamento"
+)
+AZURE_RETRIES = registry.counter("ocr_azure_retries_total", "Novas tentativas de chamadas ao Azure", ("model", "reason"))
+RETRY_ADDED_LATENCY = registry.histogram(
+    "ocr_azure_retry_added_latency_seconds",
+    "Latência adicionada por tentativas falhas e backoff",
+    ("model",)
+)
+
+def load_azure_sdk():
+    """
+    Importa o SDK do Azure e o aiohttp (~0,5s), adiados da importação do
+    módulo para o startup: importar app.main fica rápido e não depende das
+    credenciais. O gunicorn com preload chama antes do fork.
+    """
+    from azure.ai.formrecognizer.aio import DocumentAnalysisClient
+    from azure.core.credentials import AzureKeyCredential
+    from app.transport import create_session, create_transport
+    return DocumentAnalysisClient, AzureKeyCredential, create_session, create_transport
+
 class AzureOCRService:
     def __init__(self):
-        self.client = DocumentAnalysisClient(
-            endpoint=settings.DI_ENDPOINT,
-            credential=AzureKeyCredential(settings.DI_KEY)
+        # Clientes criados em start() (precisam do event loop) e fechados em close()
+        self._session = None
+        self._client_lock = asyncio.Lock()
+        
+        # Montado no primeiro uso (endpoints), a partir de DI_ENDPOINTS/DI_KEYS
+        self._endpoints: Optional[EndpointPool] = None
+        
+        self.retry_policy = RetryPolicy(
+            max_attempts=settings.AZURE_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.AZURE_RETRY_BASE_DELAY,
+            max_delay=settings.AZURE_RETRY_MAX_DELAY
+        )
+        
+        # Latência recente por modelo, usada para estimar o ganho do roteamento
+        self.latency = LatencyTracker()
+        
+        # Análises em andamento por chave (hash do conteúdo + modelo)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        self.cache: Optional[ResultCache] = None
+        if settings.CACHE_ENABLED:
+            self.cache = ResultCache(
+                max_entries=settings.CACHE_MAX_ENTRIES,
+                max_bytes=settings.CACHE_MAX_BYTES,
+                ttl=settings.CACHE_TTL,
+                disk_dir=settings.CACHE_DIR
+            )
+        
+        self.store: Optional[ResultStore] = None
+        if settings.RESULT_STORE_ENABLED:
+            self.store = ResultStore(
+                path=settings.RESULT_STORE_PATH,
+                retention_days=settings.RESULT_STORE_RETENTION_DAYS,
+                max_bytes=settings.RESULT_STORE_MAX_BYTES
+            )
+        
+        self.preprocessor = ImagePreprocessor(
+            max_pixels=settings.PREPROCESS_MAX_PIXELS,
+            quality=settings.PREPROCESS_QUALITY,
+            grayscale=settings.PREPROCESS_GRAYSCALE,
+            min_bytes=settings.PREPROCESS_MIN_BYTES,
+            workers=settings.PREPROCESS_WORKERS
+        )
+        
+        # Resultados com muitas páginas custam ~50ms de CPU por página para
+        # desserializar e processar: no event loop, travariam todas as requisições
+        self._result_executor = ThreadPoolExecutor(
+            max_workers=settings.RESULT_WORKERS, thread_name_prefix="result"
         )
     
-    async def analyze_document(self, file_data: bytes, model: str) -> Dict[str, Any]:
+    @property
+    def endpoints(self) -> EndpointPool:
+        """
+        Um endpoint por recurso do Azure, cada um com cota e circuito
+        próprios. Levanta ValueError se DI_KEYS não corresponder a DI_ENDPOINTS.
+        """
+        if self._endpoints is None:
+            self._endpoints = EndpointPool([
+                Endpoint(
+                    url=url,
+                    key=key,
+                    limiter=AdmissionController(
+                        max_concurrency=settings.AZURE_MAX_CONCURRENCY,
+                        max_queue=settings.AZURE_MAX_QUEUE,
+                        rate=settings.AZURE_RATE_LIMIT,
+                        burst=settings.AZURE_RATE_BURST,
+                        retry_after=settings.AZURE_RETRY_AFTER,
+                        name=endpoint_name(url)
+                    ),
+                    breaker=CircuitBreaker(
+                        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                        reset_timeout=settings.CIRCUIT_RESET_TIMEOUT,
+                        name=endpoint_name(url)
+                    )
+                )
+                for url, key in self._endpoint_credentials()
+            ])
+        return self._endpoints
+    
+    @staticmethod
+    def _endpoint_credentials() -> List[Tuple[str, str]]:
+        """Pares (endpoint, chave) de DI_ENDPOINTS/DI_KEYS"""
+        urls, keys = settings.DI_ENDPOINTS, settings.DI_KEYS
+        if len(keys) == 1:
+            keys = keys * len(urls)
+        if len(keys) != len(urls):
+            raise ValueError("DI_KEYS deve ter uma chave, ou uma chave por endpoint de DI_ENDPOINTS")
+        return list(zip(urls, keys))
+    
+    @property
+    def client(self):
+        """Cliente do primeiro endpoint (compatibilidade com um único recurso)"""
+        return self.endpoints.endpoints[0].client if len(self.endpoints) else None
+    
+    @client.setter
+    def client(self, client) -> None:
+        # Substitui o cliente de todos os endpoints (ex.: cliente falso em testes)
+        for endpoint in self.endpoints:
+            endpoint.client = client
+    
+    async def start(self) -> None:
         """
-        Analisa documento usando Azure OCR
+        Cria um cliente assíncrono por endpoint, todos sobre o mesmo pool
+        de conexões HTTP
         """
-        start_time = time.time()
+        async with self._client_lock:
+            if self._session is not None:
+                return
+            if not len(self.endpoints):
+                raise ValueError(NO_ENDPOINTS_MESSAGE)
+            
+            DocumentAnalysisClient, AzureKeyCredential, create_session, create_transport = load_azure_sdk()
+            self._session = create_session(
+                pool_size=settings.HTTP_POOL_SIZE,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+            )
+            for endpoint in self.endpoints:
+                if endpoint.client is not None:
+                    continue
+                # Cliente assíncrono: a espera pelo Azure não bloqueia o event loop
+                endpoint.client = DocumentAnalysisClient(
+                    endpoint=endpoint.url,
+                    credential=AzureKeyCredential(endpoint.key),
+                    polling_interval=settings.DI_POLLING_INTERVAL,
+                    transport=create_transport(
+                        self._session,
+                        connection_timeout=settings.HTTP_CONNECT_TIMEOUT,
+                        read_timeout=settings.HTTP_READ_TIMEOUT
+                    ),
+                    # Retentativas feitas pela RetryPolicy abaixo, não pelo SDK
+                    retry_total=0
+                )
+            logger.info(
+                f"Clientes Azure iniciados: {len(self.endpoints)} endpoint(s), "
+                f"pool de {settings.HTTP_POOL_SIZE} conexões"
+            )
+    
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Prontidão para receber tráfego: credenciais válidas, clientes
+        iniciados e ao menos um endpoint com o circuito não aberto. Reflete
+        a saúde observada nas chamadas reais, sem consultar o Azure.
+        """
+        try:
+            endpoints = list(self.endpoints)
+        except ValueError as e:
+            return {"ready": False, "reason": str(e), "endpoints": []}
+        
+        statuses = [
+            {
+                "endpoint": endpoint.name,
+                "circuit": endpoint.breaker.state,
+                "throttled": endpoint.throttled,
+                "outstanding": endpoint.outstanding
+            }
+            for endpoint in endpoints
+        ]
+        if not endpoints:
+            reason = NO_ENDPOINTS_MESSAGE
+        elif self._session is None:
+            reason = "Clientes do Azure não iniciados"
+        elif all(
+            endpoint.breaker.state == CircuitBreaker.OPEN and not endpoint.breaker.is_available()
+            for endpoint in endpoints
+        ):
+            reason = "Circuito aberto em todos os endpoints do Azure"
+        else:
+            reason = None
+        return {"ready": reason is None, "reason": reason, "endpoints": statuses}
+    
+    async def drain(self, timeout: float) -> None:
+        """
+        Aguarda por até timeout segundos as análises em andamento, inclusive
+        as de clientes que já desconectaram, para que cheguem ao cache e ao
+        armazenamento antes do encerramento
+        """
+        pending = list(self._inflight.values())
+        if not pending:
+            return
+        logger.info(f"Aguardando {len(pending)} análise(s) em andamento antes de encerrar")
+        if timeout > 0:
+            _, pending = await asyncio.wait(pending, timeout=timeout)
+        if pending:
+            logger.warning(f"Encerrando com {len(pending)} análise(s) interrompida(s)")
+    
+    async def close(self) -> None:
+        """
+        Fecha os clientes, a sessão HTTP e os pools de pré-processamento e
+        de resultados
+        """
+        async with self._client_lock:
+            for endpoint in self._endpoints or []:
+                if endpoint.client is not None:
+                    await endpoint.client.close()
+                    endpoint.client = None
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+        self.preprocessor.close()
+        self._result_executor.shutdown(wait=False)
+        if self.store is not None:
+            self.store.close()
+    
+    async def analyze_document(self, file_data: bytes, model: str,
+                               options: Optional[AnalysisOptions] = None) -> Dict[str, Any]:
+        """
+        Analisa documento usando Azure OCR, reaproveitando resultados em cache
+        """
+        start_time = time.perf_counter()
+        model = getattr(model, "value", model)
+        options = options or AnalysisOptions()
+        BYTES_IN.inc(len(file_data), model=model)
+        cache_key = self._cache_key(file_data, model, options)
+        
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Resultado em cache para modelo: {model}")
+                return {**cached, "cached": True, "processing_time": time.perf_counter() - start_time}
+        
+        if self.store is not None:
+            stored = await self.store.get(cache_key)
+            if stored is not None:
+                logger.info(f"Resultado armazenado para modelo: {model}")
+                if self.cache is not None:
+                    await self.cache.set(cache_key, stored)
+                return {**stored, "cached": True, "processing_time": time.perf_counter() - start_time}
+        
+        # Requisições idênticas simultâneas aguardam a mesma operação no Azure
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            logger.info(f"Aguardando análise idêntica em andamento, modelo: {model}")
+            COALESCED_REQUESTS.inc()
+            result = await asyncio.shield(task)
+            return {**result, "processing_time": time.perf_counter() - start_time}
         
+        task = asyncio.ensure_future(self._analyze_and_store(file_data, model, options, start_time, cache_key))
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        
+        # shield: o cancelamento de um cliente não cancela a operação compartilhada
+        return await asyncio.shield(task)
+    
+    def _cache_key(self, file_data: bytes, model: str, options: AnalysisOptions) -> str:
+        """
+        Chave do resultado: hash do conteúdo, modelo e opções que alteram a resposta
+        """
+        known_options = options.model_dump_json(include=set(AnalysisOptions.model_fields))
+        return f"{content_hash(file_data)}:{model}:{content_hash(known_options.encode())[:16]}"
+    
+    async def _analyze_and_store(self, file_data: bytes, model: str, options: AnalysisOptions,
+                                 start_time: float, cache_key: str) -> Dict[str, Any]:
+        """
+        Executa a análise e grava o resultado no cache em caso de sucesso
+        """
+        result = await self._analyze(file_data, model, options, start_time)
+        # Resultados parciais (blocos com falha) não vão para o cache
+        partial = bool((result.get("extracted_data") or {}).get("failed_chunks"))
+        if self.cache is not None and result["success"] and not partial:
+            await self.cache.set(cache_key, result)
+        if self.store is not None and result["success"] and not partial:
+            # A chave começa pelo hash do conteúdo (ver _cache_key)
+            await self.store.save(cache_key, cache_key.split(":", 1)[0], result)
+        return result
+    
+    async def _analyze(self, file_data: bytes, model: str, options: AnalysisOptions,
+                       start_time: float) -> Dict[str, Any]:
+        """
+        Executa a análise no Azure (sem cache)
+        """
         try:
-            # Criar objeto file-like
-            file_obj = create_file_object(file_data)
+            preprocess = settings.PREPROCESS_ENABLED if options.preprocess is None else options.preprocess
+            if preprocess:
+                with observe_stage("preprocess", model):
+                    file_data = await self.preprocessor.process(file_data)
             
-            # Analisar documento
-            logger.info(f"Iniciando análise com modelo: {model}")
-            poller = self.client.begin_analyze_document(model, document=file_obj)
-            result = poller.result()
+            if model == AUTO_MODEL:
+                model, result = await self._call_routed(file_data, options)
+            else:
+                if options.split_pages and not options.pages and model in SPLITTABLE_MODELS:
+                    page_count = count_pdf_pages(file_data)
+                    if page_count > options.split_pages:
+                        return await self._analyze_split(file_data, model, options, page_count, start_time)
+                
+                result = await self._call_azure(file_data, model, **self._azure_kwargs(options))
             
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             logger.info(f"Análise concluída em {processing_time:.2f}s")
             
             # Processar resultado
-            extracted_data = self._process_result(result, model)
+            with observe_stage("process_result", model):
+                extracted_data = await self._run_cpu(self._process_result, result, model, options.layout_format)
+            
+            with observe_stage("serialize_result", model):
+                raw_response = await self._run_cpu(self._serialize_result, result, options.raw_response)
             
             return {
                 "success": True,
+                "model": model,
                 "document_type": result.documents[0].doc_type if result.documents else None,
                 "confidence": result.documents[0].confidence if result.documents else None,
                 "extracted_data": extracted_data,
-                "raw_response": self._serialize_result(result),
+                "raw_response": raw_response,
                 "processing_time": processing_time
             }
             
-        except AzureError as e:
-            logger.error(f"Erro do Azure: {str(e)}")
-            return {
-                "success": False,
-                "error": f"Erro do Azure OCR: {str(e)}",
-                "processing_time": time.time() - start_time
-            }
+        except ServiceUnavailableError:
+            raise
         except Exception as e:
-            logger.error(f"Erro geral: {str(e)}")
-            return {
-                "success": False,
-                "error": f"Erro interno: {str(e)}",
-                "processing_time": time.time() - start_time
-            }
+            return self._error_response(e, start_time)
+    
+    async def _call_routed(self, file_data: bytes, options: Optional[AnalysisOptions]) -> Tuple[str, Any]:
+        """
+        Modelo auto: executa o prebuilt-read e só escala para o modelo
+        especializado quando a classificação indicar. Retorna (modelo, resultado).
+        """
+        kwargs = self._azure_kwargs(options)
+        loop = asyncio.get_running_loop()
+        read_started = loop.time()
+        result = await self._call_azure(file_data, READ_MODEL, **kwargs)
+        read_time = loop.time() - read_started
+        
+        model, reason = classify_document(result)
+        ROUTING_DECISIONS.inc(model=model, reason=reason)
+        logger.info(f"Modelo auto: {model} ({reason})")
+        
+        if model == READ_MODEL:
+            layout_estimate = self.latency.estimate("prebuilt-layout")
+            read_estimate = self.latency.estimate(READ_MODEL)
+            if layout_estimate is not None and read_estimate is not None:
+                ROUTING_LATENCY_SAVED.observe(max(layout_estimate - read_estimate, 0))
+            return model, result
+        
+        ROUTING_ESCALATION_OVERHEAD.observe(read_time, model=model)
+        return model, await self._call_azure(file_data, model, **kwargs)
+    
+    def _azure_kwargs(self, options: Optional[AnalysisOptions]) -> Dict[str, Any]:
+        """
+        Parâmetros repassados ao begin_analyze_document
+        """
+        if options is not None and options.pages:
+            return {"pages": options.pages.replace(" ", "")}
+        return {}
     
-    def _process_result(self, result, model: str) -> Dict[str, Any]:
+    async def _analyze_split(self, file_data: bytes, model: str, options: AnalysisOptions,
+                             page_count: int, start_time: float) -> Dict[str, Any]:
         """
-        Processa resultado baseado no modelo usado
+        Divide o PDF em blocos de páginas, analisa os blocos em paralelo e
+        recombina no formato do próprio modelo (_process_layout ou
+        _process_read, com o content unido na ordem das páginas). Blocos com
+        falha são listados em failed_chunks para nova tentativa só deles
+        (opção pages).
+        Os blocos são no máximo SPLIT_MAX_CHUNKS (blocos maiores que
+        split_pages se preciso) e no máximo SPLIT_MAX_CONCURRENCY rodam ao
+        mesmo tempo. Rejeição da admissão local não vira sucesso parcial:
+        cancela os demais blocos e a requisição inteira recebe 503.
         """
-        if model == "prebuilt-receipt":
-            return self._process_receipt(result)
-        elif model == "prebuilt-invoice":
-            return self._process_invoice(result)
-        elif model == "prebuilt-layout":
-            return self._process_layout(result)
-        elif model == "prebuilt-businessCard":
-            return self._process_business_card(result)
-        elif model == "prebuilt-idDocument":
-            return self._process_id_document(result)
+        size = max(options.split_pages, -(-page_count // settings.SPLIT_MAX_CHUNKS))
+        ranges = [
+            f"{first}-{min(first + size - 1, page_count)}"
+            for first in range(1, page_count + 1, size)
+        ]
+        logger.info(f"Dividindo documento de {page_count} páginas em {len(ranges)} blocos de até {size}")
+        
+        semaphore = asyncio.Semaphore(max(1, min(settings.SPLIT_MAX_CONCURRENCY, settings.AZURE_MAX_CONCURRENCY)))
+        tasks: List[asyncio.Future] = []
+        
+        async def analyze_chunk(page_range: str):
+            async with semaphore:
+                try:
+                    return await self._call_azure(file_data, model, pages=page_range)
+                except ServiceUnavailableError:
+                    for task in tasks:
+                        if task is not asyncio.current_task():
+                            task.cancel()
+                    raise
+        
+        tasks.extend(asyncio.ensure_future(analyze_chunk(page_range)) for page_range in ranges)
+        try:
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        for outcome in outcomes:
+            if isinstance(outcome, ServiceUnavailableError):
+                raise outcome
+        
+        if model == READ_MODEL:
+            process, merged = self._process_read, {"content": [], "pages": []}
         else:
-            return self._process_generic(result)
-    
-    def _process_receipt(self, result) -> Dict[str, Any]:
-        """Processa resultado de recibo"""
-        extracted = {}
-        
-        if result.documents:
-            doc = result.documents[0]
-            if doc.fields:
-                # Campos específicos de recibo
-                fields_map = {
-                    "MerchantName": "merchant_name",
-                    "MerchantAddress": "merchant_address", 
-                    "MerchantPhoneNumber": "merchant_phone",
-                    "TransactionDate": "transaction_date",
-                    "TransactionTime": "transaction_time",
-                    "Items": "items",
-                    "Subtotal": "subtotal",
-                    "TotalTax": "tax",
-                    "Tip": "tip",
-                    "Total": "total"
-                }
-                
-                for azure_field, our_field in fields_map.items():
-                    if azure_field in doc.fields:
-                        field = doc.fields[azure_field]
-                        extracted[our_field] = {
-                            "value": self._extract_field_value(field),
-                            "confidence": field.confidence
-                        }
+            process, merged = self._process_layout, {"pages": [], "tables": [], "text": []}
+        failed_chunks = []
+        raw_chunks = []
+        errors = []
+        # Blocos em ordem crescente de páginas: o content unido segue a ordem do documento
+        for page_range, outcome in zip(ranges, outcomes):
+            if isinstance(outcome, BaseException):
+                errors.append(outcome)
+                failed_chunks.append({"pages": page_range, "error": str(outcome)})
+                continue
+            
+            with observe_stage("process_result", model):
+                chunk = await self._run_cpu(process, outcome, options.layout_format)
+            for key, items in merged.items():
+                if key == "content":
+                    items.append(chunk["content"] or "")
+                else:
+                    items.extend(chunk[key])
+            
+            if options.raw_response != RawResponseMode.NONE:
+                with observe_stage("serialize_result", model):
+                    raw_chunks.append({
+                        "pages": page_range,
+                        "result": await self._run_cpu(self._serialize_result, outcome, options.raw_response)
+                    })
         
-        return extracted
+        if len(errors) == len(ranges):
+            return self._error_response(errors[0], start_time)
+        
+        merged["pages"].sort(key=lambda page: page["page_number"])
+        if "content" in merged:
+            merged["content"] = "\n".join(merged["content"])
+        merged["failed_chunks"] = failed_chunks
+        processing_time = time.perf_counter() - start_time
+        logger.info(f"Análise em {len(ranges)} blocos concluída em {processing_time:.2f}s, {len(errors)} com falha")
+        
+        return {
+            "success": True,
+            "model": model,
+            "document_type": None,
+            "confidence": None,
+            "extracted_data": merged,
+            "raw_response": {"chunks": raw_chunks} if options.raw_response != RawResponseMode.NONE else None,
+            "processing_time": processing_time
+        }
+    
+    def _error_response(self, error: Exception, start_time: float) -> Dict[str, Any]:
+        """
+        Converte uma falha da análise em resposta com success=False
+        """
+        from azure.core.exceptions import AzureError
+        
+        if isinstance(error, asyncio.TimeoutError):
+            logger.error(f"Tempo limite excedido após {time.perf_counter() - start_time:.2f}s")
+            message = f"Erro do Azure OCR: tempo limite de {settings.AZURE_REQUEST_DEADLINE}s excedido"
+        elif isinstance(error, AzureError):
+            logger.error(f"Erro do Azure: {str(error)}")
+            message = f"Erro do Azure OCR: {str(error)}"
+        else:
+            logger.error(f"Erro geral: {str(error)}")
+            message = f"Erro interno: {str(error)}"
+        
+        return {
+            "success": False,
+            "error": message,
+            "processing_time": time.perf_counter() - start_time
+        }
+    
+    async def analyze_stream(self, file_data: bytes, model: str,
+                             options: Optional[AnalysisOptions] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Analisa o documento e retorna um iterador de eventos (metadados,
+        páginas, tabelas) para envio incremental, sem montar a resposta inteira.
+        Não usa cache.
+        """
+        start_time = time.perf_counter()
+        model = getattr(model, "value", model)
+        BYTES_IN.inc(len(file_data), model=model)
+        
+        try:
+            if model == AUTO_MODEL:
+                model, result = await self._call_routed(file_data, options)
+            else:
+                result = await self._call_azure(file_data, model, **self._azure_kwargs(options))
+        except ServiceUnavailableError:
+            raise
+        except Exception as e:
+            return iter([{"type": "error", **self._error_response(e, start_time)}])
+        
+        layout_format = options.layout_format if options else LayoutFormat.OBJECTS
+        return self._iter_stream_events(result, model, time.perf_counter() - start_time, layout_format)
+    
+    def _iter_stream_events(self, result, model: str, processing_time: float,
+                            layout_format: LayoutFormat = LayoutFormat.OBJECTS) -> Iterator[Dict[str, Any]]:
+        """Gera os eventos do modo streaming a partir do resultado do Azure"""
+        yield {
+            "type": "metadata",
+            "model": model,
+            "document_type": result.documents[0].doc_type if result.documents else None,
+            "confidence": result.documents[0].confidence if result.documents else None,
+            "page_count": len(result.pages or []),
+            "table_count": len(result.tables or []),
+            "processing_time": processing_time
+        }
+        
+        for kind, data in self._iter_layout(result, layout_format):
+            yield {"type": kind, **data}
+        
+        # Campos extraídos dos modelos especializados
+        if model not in ("prebuilt-layout", "prebuilt-read"):
+            yield {"type": "document", "extracted_data": self._process_result(result, model)}
+        
+        yield {"type": "end", "success": True}
     
-    def _process_invoice(self, result) -> Dict[str, Any]:
-        """Processa resultado de fatura"""
-        # Implementar lógica específica para faturas
-        return {"type": "invoice", "data": "invoice_data"}
+    async def _call_azure(self, file_data: bytes, model: str, **kwargs):
+        """
+        Chama o Azure com balanceamento entre endpoints, controle de admissão,
+        circuit breaker e novas tentativas (backoff com jitter, respeitando
+        Retry-After) até o prazo. Cada tentativa escolhe o endpoint com menos
+        chamadas pendentes, evitando o que acabou de falhar.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + settings.AZURE_REQUEST_DEADLINE
+        attempt = 0
+        failed_endpoint = None
+        
+        while True:
+            endpoint = self.endpoints.select(exclude=failed_endpoint)
+            endpoint.outstanding += 1
+            try:
+                async with endpoint.limiter.slot():
+                    endpoint.breaker.before_call()
+                    attempt_started = loop.time()
+                    try:
+                        result = await asyncio.wait_for(
+                            self._submit_and_poll(endpoint, file_data, model, **kwargs),
+                            timeout=max(deadline - loop.time(), 0)
+                        )
+                    except Exception as e:
+                        if self.retry_policy.is_endpoint_failure(e):
+                            endpoint.breaker.record_failure()
+                        else:
+                            endpoint.breaker.record_success()
+                        error = e
+                    except BaseException:
+                        endpoint.breaker.record_cancel()
+                        raise
+                    else:
+                        endpoint.breaker.record_success()
+                        ENDPOINT_REQUESTS.inc(endpoint=endpoint.name, outcome="success")
+                        self.latency.observe(model, loop.time() - attempt_started)
+                        if attempt:
+                            RETRY_ADDED_LATENCY.observe(loop.time() - started, model=model)
+                        return result
+            finally:
+                endpoint.outstanding -= 1
+            
+            ENDPOINT_REQUESTS.inc(endpoint=endpoint.name, outcome="error")
+            failed_endpoint = endpoint
+            if getattr(error, "status_code", None) == 429:
+                # Cota do recurso esgotada: os próximos pedidos vão para os demais
+                endpoint.throttle(self.retry_policy.retry_after(error) or settings.ENDPOINT_THROTTLE_COOLDOWN)
+            
+            # Fora da vaga de admissão durante o backoff; com outro endpoint
+            # saudável disponível, tenta de imediato
+            delay = self.retry_policy.delay(attempt, error)
+            alternative = self.endpoints.select(exclude=endpoint)
+            if alternative is not endpoint and not alternative.throttled and alternative.breaker.is_available():
+                delay = 0
+            if (not self.retry_policy.is_retryable(error)
+                    or attempt + 1 >= self.retry_policy.max_attempts
+                    or loop.time() + delay >= deadline):
+                raise error
+            
+            reason = str(getattr(error, "status_code", None) or type(error).__name__)
+            AZURE_RETRIES.inc(model=model, reason=reason)
+            logger.warning(
+                f"Falha transitória do Azure em {endpoint.name} ({reason}), "
+                f"nova tentativa em {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
     
-    def _process_layout(self, result) -> Dict[str, Any]:
+    async def _submit_and_poll(self, endpoint: Endpoint, file_data: bytes, model: str, **kwargs):
+        """
+        Submete o documento ao endpoint e aguarda o resultado da operação
+        """
+        from azure.core.pipeline import PipelineResponse
+        from app.transport import create_polling
+        
+        # Uso fora do lifespan da aplicação (ex.: scripts): cria os clientes sob demanda
+        if endpoint.client is None:
+            await self.start()
+        
+        # Criar objeto file-like
+        file_obj = create_file_object(file_data)
+        
+        logger.info(f"Iniciando análise com modelo: {model} ({endpoint.name})")
+        with observe_stage("azure_submit", model):
+            # cls devolve a resposta HTTP sem desserializar: o AnalyzeResult é montado no pool de threads
+            poller = await endpoint.client.begin_analyze_document(
+                model,
+                document=file_obj,
+                polling=create_polling(settings.DI_POLLING_INTERVAL, endpoint.url),
+                cls=lambda pipeline_response, _, headers: pipeline_response,
+                **kwargs
+            )
+        with observe_stage("azure_poll", model):
+            outcome = await poller.result()
+        # Clientes que ignoram cls (ex.: stubs de teste) já devolvem o AnalyzeResult
+        if not isinstance(outcome, PipelineResponse):
+            return outcome
+        with observe_stage("azure_deserialize", model):
+            return await self._run_cpu(endpoint.client._analyze_document_callback, outcome, None, {})
+    
+    async def _run_cpu(self, function, *args):
+        """Executa trabalho de CPU sobre o resultado no pool de threads, fora do event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._result_executor, function, *args)
+    
+    def _process_result(self, result, model: str,
+                        layout_format: LayoutFormat = LayoutFormat.OBJECTS) -> Dict[str, Any]:
+        """
+        Processa resultado baseado no modelo usado: modelos com mapa de
+        campos (app.extraction.FIELD_MAPS) extraem os campos do documento
+        """
+        if model in FIELD_MAPS:
+            return extract_document(result, model)
+        if model == "prebuilt-layout":
+            return self._process_layout(result, layout_format)
+        return self._process_read(result, layout_format)
+    
+    def _process_layout(self, result, layout_format: LayoutFormat = LayoutFormat.OBJECTS) -> Dict[str, Any]:
         """Processa resultado de layout"""
         extracted = {
             "pages": [],
@@ -122,8 +680,22 @@ class AzureOCRService:
             "text": []
         }
         
+        for kind, data in self._iter_layout(result, layout_format):
+            if kind == "page":
+                extracted["pages"].append(data)
+            else:
+                extracted["tables"].append(data)
+        
+        return extracted
+    
+    def _iter_layout(self, result, layout_format: LayoutFormat = LayoutFormat.OBJECTS) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Gera ("page", dados) para cada página e ("table", dados) para cada tabela"""
+        if layout_format == LayoutFormat.COMPACT:
+            yield from self._iter_layout_compact(result)
+            return
+        
         # Processar páginas
-        for page in result.pages:
+        for page in result.pages or []:
             page_data = {
                 "page_number": page.page_number,
                 "width": page.width,
@@ -132,16 +704,16 @@ class AzureOCRService:
                 "lines": []
             }
             
-            for line in page.lines:
+            for line in page.lines or []:
                 page_data["lines"].append({
                     "content": line.content,
                     "confidence": getattr(line, 'confidence', None)
                 })
             
-            extracted["pages"].append(page_data)
+            yield "page", page_data
         
         # Processar tabelas
-        for table in result.tables:
+        for table in result.tables or []:
             table_data = {
                 "row_count": table.row_count,
                 "column_count": table.column_count,
@@ -155,33 +727,142 @@ class AzureOCRService:
                     "content": cell.content
                 })
             
-            extracted["tables"].append(table_data)
-        
-        return extracted
+            yield "table", table_data
     
-    def _process_business_card(self, result) -> Dict[str, Any]:
-        """Processa resultado de cartão de visita"""
-        return {"type": "business_card", "data": "business_card_data"}
-    
-    def _process_id_document(self, result) -> Dict[str, Any]:
-        """Processa resultado de documento de identidade"""
-        return {"type": "id_document", "data": "id_document_data"}
-    
-    def _process_generic(self, result) -> Dict[str, Any]:
-        """Processa resultado genérico"""
-        return {"type": "generic", "data": "generic_data"}
+    def _iter_layout_compact(self, result) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Formato compacto: as linhas de cada página viram arrays paralelos
+        (content, confidence) e cada tabela uma matriz row_count x column_count
+        em ordem de linha, com o texto na célula superior esquerda das células
+        mescladas e None nas demais. Textos repetidos (cabeçalhos, "0,00")
+        são internados: todas as ocorrências referenciam a mesma string.
+        """
+        strings: Dict[str, str] = {}
+        intern = strings.setdefault
+        
+        for page in result.pages or []:
+            lines = page.lines or []
+            yield "page", {
+                "page_number": page.page_number,
+                "width": page.width,
+                "height": page.height,
+                "unit": page.unit,
+                "lines": {
+                    "content": [intern(line.content, line.content) for line in lines],
+                    "confidence": [getattr(line, 'confidence', None) for line in lines]
+                }
+            }
+        
+        for table in result.tables or []:
+            rows = [[None] * table.column_count for _ in range(table.row_count)]
+            header_rows = set()
+            for cell in table.cells:
+                rows[cell.row_index][cell.column_index] = intern(cell.content, cell.content)
+                if getattr(cell, 'kind', None) == "columnHeader":
+                    header_rows.add(cell.row_index)
+            
+            yield "table", {
+                "row_count": table.row_count,
+                "column_count": table.column_count,
+                "header_rows": len(header_rows),
+                "rows": rows
+            }
     
-    def _extract_field_value(self, field) -> Any:
-        """Extrai valor do campo Azure"""
-        if hasattr(field, 'value'):
-            if hasattr(field.value, 'amount'):
-                return field.value.amount
-            return field.value
-        return None
+    def _process_read(self, result, layout_format: LayoutFormat = LayoutFormat.OBJECTS) -> Dict[str, Any]:
+        """Processa resultado de leitura (prebuilt-read e modelos sem campos)"""
+        return {
+            "content": result.content,
+            "pages": [data for kind, data in self._iter_layout(result, layout_format) if kind == "page"]
+        }
     
-    def _serialize_result(self, result) -> Dict[str, Any]:
-        """Serializa resultado para JSON"""
+    def _serialize_result(self, result, mode: RawResponseMode = RawResponseMode.FULL) -> Optional[Dict[str, Any]]:
+        """Serializa resultado para JSON conforme o modo pedido"""
+        if mode == RawResponseMode.NONE:
+            return None
+        if mode == RawResponseMode.COMPACT:
+            return self._serialize_compact(result)
         try:
             return result.to_dict()
         except:
-            return {"raw_result": "Unable to serialize"}
\ No newline at end of file
+            return {"raw_result": "Unable to serialize"}
+    
+    def _serialize_compact(self, result) -> Dict[str, Any]:
+        """
+        Serializa apenas o conteúdo, sem polígonos, spans e palavras,
+        montando o dict diretamente (sem passar por to_dict)
+        """
+        return {
+            "api_version": result.api_version,
+            "model_id": result.model_id,
+            "content": result.content,
+            "pages": [
+                {
+                    "page_number": page.page_number,
+                    "width": page.width,
+                    "height": page.height,
+                    "unit": page.unit,
+                    "angle": page.angle,
+                    "lines": [line.content for line in page.lines or []]
+                }
+                for page in result.pages or []
+            ],
+            "tables": [
+                {
+                    "row_count": table.row_count,
+                    "column_count": table.column_count,
+                    "cells": [
+                        {
+                            "kind": cell.kind,
+                            "row_index": cell.row_index,
+                            "column_index": cell.column_index,
+                            "content": cell.content
+                        }
+                        for cell in table.cells
+                    ]
+                }
+                for table in result.tables or []
+            ],
+            "key_value_pairs": [
+                {
+                    "key": pair.key.content if pair.key else None,
+                    "value": pair.value.content if pair.value else None,
+                    "confidence": pair.confidence
+                }
+                for pair in result.key_value_pairs or []
+            ],
+            "documents": [
+                {
+                    "doc_type": doc.doc_type,
+                    "confidence": doc.confidence,
+                    "fields": {
+                        name: self._serialize_compact_field(field)
+                        for name, field in (doc.fields or {}).items()
+                    }
+                }
+                for doc in result.documents or []
+            ]
+        }
+    
+    def _serialize_compact_field(self, field) -> Optional[Dict[str, Any]]:
+        """Serializa um DocumentField sem regiões e spans"""
+        if field is None:
+            return None
+        
+        if field.value_type == "list":
+            value = [self._serialize_compact_field(item) for item in field.value or []]
+        elif field.value_type == "dictionary":
+            value = {
+                name: self._serialize_compact_field(item)
+                for name, item in (field.value or {}).items()
+            }
+        elif hasattr(field.value, "to_dict"):
+            value = field.value.to_dict()
+        else:
+            value = field.value
+        
+        return {
+            "value_type": field.value_type,
+            "value": value,
+            "content": field.content,
+            "confidence": field.confidence
+        }
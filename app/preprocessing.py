@@ -0,0 +1,124 @@
+"""
+Pré-processamento de imagens antes do envio ao Azure: reduz fotos grandes
+para um orçamento de pixels, converte para tons de cinza e recodifica em JPEG.
+Usa Pillow (dependência opcional); sem ela as imagens seguem inalteradas.
+"""
+import asyncio
+import importlib.util
+import io
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.metrics import registry
+from app.utils import detect_mime_type
+
+# Pillow só é importado no primeiro pré-processamento (ver preprocess_image)
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+logger = logging.getLogger(__name__)
+
+# Formatos que o Pillow decodifica sem plugins e que vale a pena recodificar
+PREPROCESSABLE_TYPES = ("image/jpeg", "image/png", "image/bmp", "image/tiff")
+
+PREPROCESSED_IMAGES = registry.counter(
+    "ocr_preprocess_images_total",
+    "Imagens avaliadas pelo pré-processamento",
+    ("outcome",)
+)
+PREPROCESS_BYTES_SAVED = registry.counter(
+    "ocr_preprocess_bytes_saved_total",
+    "Bytes deixados de enviar ao Azure pelo pré-processamento"
+)
+
+
+def is_image(data: bytes) -> bool:
+    """Indica se os primeiros bytes correspondem a um formato de imagem recodificável"""
+    return detect_mime_type(data) in PREPROCESSABLE_TYPES
+
+
+def preprocess_image(data: bytes, max_pixels: int, quality: int = 85,
+                     grayscale: bool = True) -> Optional[bytes]:
+    """
+    Reduz a imagem para no máximo max_pixels, opcionalmente em tons de cinza,
+    e recodifica em JPEG. Retorna None se o resultado não for menor que o
+    original ou se a imagem tiver várias páginas (TIFF), que o JPEG perderia.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "n_frames", 1) > 1:
+            return None
+
+        width, height = image.size
+        scale = min(1.0, math.sqrt(max_pixels / (width * height))) if max_pixels > 0 else 1.0
+        target = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        # JPEG: decodifica já em escala reduzida (DCT), bem mais rápido que decodificar tudo
+        if image.format == "JPEG":
+            image.draft("L" if grayscale else "RGB", target)
+
+        # Fotos de celular: aplica a rotação do EXIF antes de descartar os metadados
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("L" if grayscale else "RGB")
+        if image.size != target and scale < 1.0:
+            image = image.resize(target, Image.LANCZOS)
+
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True)
+
+    processed = output.getvalue()
+    if len(processed) >= len(data):
+        return None
+    return processed
+
+
+class ImagePreprocessor:
+    """Executa o pré-processamento em um pool de threads (Pillow libera o GIL)"""
+
+    def __init__(self, max_pixels: int, quality: int, grayscale: bool,
+                 min_bytes: int, workers: int):
+        self.max_pixels = max_pixels
+        self.quality = quality
+        self.grayscale = grayscale
+        self.min_bytes = min_bytes
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preprocess")
+
+        if not PILLOW_AVAILABLE:
+            logger.warning("Pillow não instalado: pré-processamento de imagens desativado")
+
+    @property
+    def available(self) -> bool:
+        return PILLOW_AVAILABLE
+
+    async def process(self, data: bytes) -> bytes:
+        """
+        Retorna a imagem reduzida, ou os bytes originais se não for uma imagem,
+        for pequena demais, falhar ao decodificar ou não ficar menor
+        """
+        if not self.available or len(data) < self.min_bytes or not is_image(data):
+            PREPROCESSED_IMAGES.inc(outcome="skipped")
+            return data
+
+        loop = asyncio.get_running_loop()
+        try:
+            processed = await loop.run_in_executor(
+                self._executor, preprocess_image, data, self.max_pixels, self.quality, self.grayscale
+            )
+        except Exception as e:
+            logger.warning(f"Falha no pré-processamento, enviando original: {e}")
+            PREPROCESSED_IMAGES.inc(outcome="error")
+            return data
+
+        if processed is None:
+            PREPROCESSED_IMAGES.inc(outcome="unchanged")
+            return data
+
+        PREPROCESSED_IMAGES.inc(outcome="reduced")
+        PREPROCESS_BYTES_SAVED.inc(len(data) - len(processed))
+        logger.info(f"Imagem pré-processada: {len(data)} -> {len(processed)} bytes")
+        return processed
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,141 @@
+"""
+Retentativas com backoff exponencial (respeitando Retry-After) e circuit
+breaker para as chamadas ao Azure.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Optional
+
+from app.limiter import ServiceUnavailableError
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_STATE = registry.gauge(
+    "ocr_circuit_state",
+    "Estado do circuit breaker (0=fechado, 1=meio-aberto, 2=aberto)",
+    ("endpoint",)
+)
+CIRCUIT_TRANSITIONS = registry.counter(
+    "ocr_circuit_transitions_total",
+    "Transições de estado do circuit breaker",
+    ("endpoint", "from_state", "to_state")
+)
+
+# Status HTTP transitórios que valem nova tentativa
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(ServiceUnavailableError):
+    """Circuito aberto: o endpoint está falhando e a chamada nem é tentada"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, name: str = "default"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        CIRCUIT_STATE.set_function(lambda: self._STATE_VALUES[self.state], endpoint=name)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit breaker ({self.name}): {self.state} -> {state}")
+        CIRCUIT_TRANSITIONS.inc(endpoint=self.name, from_state=self.state, to_state=state)
+        self.state = state
+
+    def is_available(self) -> bool:
+        """Indica se before_call aceitaria uma chamada agora (sem alterar o estado)"""
+        if self.state == self.OPEN:
+            return time.monotonic() >= self._opened_at + self.reset_timeout
+        if self.state == self.HALF_OPEN:
+            return not self._probe_in_flight
+        return True
+
+    def before_call(self) -> None:
+        """Levanta CircuitOpenError se a chamada não deve ser feita"""
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError("Azure OCR indisponível no momento", retry_after=remaining)
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            # Apenas uma chamada de teste por vez enquanto meio-aberto
+            if self._probe_in_flight:
+                raise CircuitOpenError("Azure OCR indisponível no momento", retry_after=1)
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        self._transition(self.CLOSED)
+
+    def record_cancel(self) -> None:
+        """Chamada cancelada: libera a vaga de teste sem mudar o estado"""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable(self, error: Exception) -> bool:
+        # Importado aqui para não carregar o azure.core na importação da aplicação
+        from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+        if isinstance(error, HttpResponseError):
+            return error.status_code in RETRYABLE_STATUS
+        return isinstance(error, (ServiceRequestError, ServiceResponseError, asyncio.TimeoutError))
+
+    def is_endpoint_failure(self, error: Exception) -> bool:
+        """Falhas que indicam endpoint fora do ar (contam para o circuit breaker)"""
+        from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+        if isinstance(error, HttpResponseError):
+            return error.status_code is not None and error.status_code >= 500
+        return isinstance(error, (ServiceRequestError, ServiceResponseError, asyncio.TimeoutError))
+
+    def retry_after(self, error: Exception) -> Optional[float]:
+        """Lê o Retry-After da resposta do Azure, se houver"""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+
+        headers = response.headers
+        for header, scale in (("retry-after-ms", 1000), ("x-ms-retry-after-ms", 1000), ("Retry-After", 1)):
+            value = headers.get(header)
+            if value:
+                try:
+                    return float(value) / scale
+                except ValueError:
+                    continue
+        return None
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """Backoff exponencial com jitter; o Retry-After do servidor tem prioridade"""
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
@@ -0,0 +1,90 @@
+"""
+Roteamento do modelo "auto": classifica o resultado do prebuilt-read com
+sinais baratos (palavras-chave, número de páginas, linhas numéricas em
+colunas) e indica se é preciso escalar para um modelo especializado.
+"""
+import re
+from typing import Dict, Optional, Tuple
+
+from app.metrics import registry
+
+AUTO_MODEL = "auto"
+READ_MODEL = "prebuilt-read"
+
+INVOICE_KEYWORDS = (
+    "invoice", "fatura", "nota fiscal", "nf-e", "danfe", "bill to", "due date",
+    "vencimento", "purchase order", "pedido de compra", "remit to", "amount due"
+)
+RECEIPT_KEYWORDS = (
+    "receipt", "recibo", "cupom fiscal", "subtotal", "troco", "change due",
+    "cashier", "operador", "thank you", "obrigado", "gorjeta", "total a pagar"
+)
+# Palavras-chave necessárias para escalar
+MIN_KEYWORD_HITS = 2
+# Recibos raramente têm mais de 2 páginas
+MAX_RECEIPT_PAGES = 2
+# Linhas majoritariamente numéricas que indicam tabelas
+NUMERIC_LINE = re.compile(r"^[\s\d.,:/%$R€£()+-]*\d[\s\d.,:/%$R€£()+-]*$")
+MIN_TABLE_NUMERIC_LINES = 12
+MIN_TABLE_NUMERIC_RATIO = 0.25
+
+ROUTING_DECISIONS = registry.counter(
+    "ocr_routing_decisions_total",
+    "Decisões do modelo auto",
+    ("model", "reason")
+)
+ROUTING_LATENCY_SAVED = registry.histogram(
+    "ocr_routing_latency_saved_seconds",
+    "Latência estimada economizada ao ficar no prebuilt-read (EWMA do layout - EWMA do read)"
+)
+ROUTING_ESCALATION_OVERHEAD = registry.histogram(
+    "ocr_routing_escalation_overhead_seconds",
+    "Latência do prebuilt-read descartada ao escalar para outro modelo",
+    ("model",)
+)
+MODEL_LATENCY_EWMA = registry.gauge(
+    "ocr_model_latency_ewma_seconds",
+    "Média móvel exponencial da latência das chamadas ao Azure por modelo",
+    ("model",)
+)
+
+
+class LatencyTracker:
+    """Média móvel exponencial (EWMA) da latência por modelo"""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._estimates: Dict[str, float] = {}
+
+    def observe(self, model: str, seconds: float) -> None:
+        previous = self._estimates.get(model)
+        estimate = seconds if previous is None else previous + self.alpha * (seconds - previous)
+        self._estimates[model] = estimate
+        MODEL_LATENCY_EWMA.set(estimate, model=model)
+
+    def estimate(self, model: str) -> Optional[float]:
+        return self._estimates.get(model)
+
+
+def classify_document(result) -> Tuple[str, str]:
+    """
+    Escolhe o modelo mais barato suficiente a partir do resultado do
+    prebuilt-read. Retorna (modelo, motivo).
+    """
+    text = (result.content or "").lower()
+    pages = result.pages or []
+
+    if sum(keyword in text for keyword in INVOICE_KEYWORDS) >= MIN_KEYWORD_HITS:
+        return "prebuilt-invoice", "invoice_keywords"
+
+    if (len(pages) <= MAX_RECEIPT_PAGES
+            and sum(keyword in text for keyword in RECEIPT_KEYWORDS) >= MIN_KEYWORD_HITS):
+        return "prebuilt-receipt", "receipt_keywords"
+
+    for page in pages:
+        lines = page.lines or []
+        numeric = sum(1 for line in lines if NUMERIC_LINE.match(line.content))
+        if numeric >= MIN_TABLE_NUMERIC_LINES and numeric >= MIN_TABLE_NUMERIC_RATIO * len(lines):
+            return "prebuilt-layout", "tabular_content"
+
+    return READ_MODEL, "plain_text"
@@ -0,0 +1,49 @@
+"""
+Serialização JSON rápida (orjson) das respostas da API.
+
+O resultado do serviço é confiável: em vez de validar de novo com
+Pydantic, apenas completamos os campos padrão do modelo de resposta e
+codificamos direto com orjson.
+"""
+from typing import Any, Dict, Type
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    """Tipos não suportados nativamente pelo orjson (ex.: objetos do SDK do Azure)"""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return str(obj)
+
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+_defaults_cache: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+
+def response_payload(model_class: Type[BaseModel], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Monta o payload no formato de model_class sem revalidar: campos
+    ausentes recebem o valor padrão e chaves extras são descartadas
+    """
+    defaults = _defaults_cache.get(model_class)
+    if defaults is None:
+        defaults = _defaults_cache[model_class] = {
+            name: None if field.is_required() else field.get_default(call_default_factory=True)
+            for name, field in model_class.model_fields.items()
+        }
+    payload = dict(defaults)
+    payload.update((key, value) for key, value in data.items() if key in defaults)
+    return payload
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,207 @@
+"""
+Armazenamento persistente dos resultados de análise em SQLite (modo WAL),
+no volume de logs: JSON comprimido com zlib, indexado por hash do
+conteúdo, modelo, data e document_type, com retenção por idade e por
+tamanho total.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from app.metrics import registry
+from app.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+STORE_WRITES = registry.counter("ocr_result_store_writes_total", "Resultados gravados no armazenamento")
+STORE_HITS = registry.counter("ocr_result_store_hits_total", "Análises atendidas pelo armazenamento, sem chamar o Azure")
+STORE_PRUNED = registry.counter("ocr_result_store_pruned_total", "Resultados removidos pela retenção")
+STORE_BYTES = registry.gauge("ocr_result_store_bytes", "Bytes comprimidos mantidos no armazenamento")
+
+# A cada quantas gravações a retenção é aplicada
+PRUNE_INTERVAL = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    document_type TEXT,
+    confidence REAL,
+    created_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_hash ON results (hash, created_at);
+CREATE INDEX IF NOT EXISTS results_model ON results (model, created_at);
+CREATE INDEX IF NOT EXISTS results_document_type ON results (document_type, created_at);
+CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at);
+"""
+
+SUMMARY_COLUMNS = "hash, model, document_type, confidence, created_at, size"
+
+
+class ResultStore:
+    def __init__(self, path: str, retention_days: float, max_bytes: int):
+        self.path = path
+        self.retention = retention_days * 86400
+        self.max_bytes = max_bytes
+
+        # Uma conexão por processo; as chamadas rodam em threads (asyncio.to_thread)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._writes = 0
+
+        STORE_BYTES.set_function(lambda: self._bytes)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre o banco na primeira utilização (chamado com o lock)"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA busy_timeout = 5000")
+            # auto_vacuum só tem efeito antes da criação das tabelas
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+            self._prune()
+            logger.info(f"Armazenamento de resultados em {self.path}: {self._bytes} bytes")
+        return self._connection
+
+    async def save(self, key: str, content_hash: str, result: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._save, key, content_hash, result)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Resultado exato (hash, modelo pedido e opções), para reaproveitar a análise"""
+        result = await asyncio.to_thread(self._get, key)
+        if result is not None:
+            STORE_HITS.inc()
+        return result
+
+    async def latest(self, content_hash: str, model: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Resultado mais recente do documento, opcionalmente de um modelo"""
+        return await asyncio.to_thread(self._latest, content_hash, model)
+
+    async def search(self, **filters: Any) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._search, **filters)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _save(self, key: str, content_hash: str, result: Dict[str, Any]) -> None:
+        payload = zlib.compress(dumps(result))
+        try:
+            with self._lock:
+                connection = self._connect()
+                previous = connection.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, content_hash, result.get("model"), result.get("document_type"),
+                     result.get("confidence"), time.time(), len(payload), payload)
+                )
+                self._bytes += len(payload) - (previous[0] if previous else 0)
+                STORE_WRITES.inc()
+
+                self._writes += 1
+                if self._writes % PRUNE_INTERVAL == 0 or self._bytes > self.max_bytes:
+                    self._prune()
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar resultado no armazenamento: {str(e)}")
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT payload FROM results WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.retention)
+            ).fetchone()
+        return orjson.loads(zlib.decompress(row[0])) if row else None
+
+    def _latest(self, content_hash: str, model: Optional[str]) -> Optional[Dict[str, Any]]:
+        query = f"SELECT {SUMMARY_COLUMNS}, payload FROM results WHERE hash = ? AND created_at >= ?"
+        params: List[Any] = [content_hash, time.time() - self.retention]
+        if model:
+            query += " AND model = ?"
+            params.append(model)
+        query += " ORDER BY created_at DESC LIMIT 1"
+
+        with self._lock:
+            row = self._connect().execute(query, params).fetchone()
+        if row is None:
+            return None
+        return {**self._summary(row), "result": orjson.loads(zlib.decompress(row[-1]))}
+
+    def _search(self, model: Optional[str] = None, document_type: Optional[str] = None,
+                since: Optional[float] = None, until: Optional[float] = None,
+                limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        # A retenção vale também entre uma limpeza e outra (_prune a cada PRUNE_INTERVAL gravações)
+        conditions, params = ["created_at >= ?"], [time.time() - self.retention]
+        for condition, value in (
+            ("model = ?", model),
+            ("document_type = ?", document_type),
+            ("created_at >= ?", since),
+            ("created_at < ?", until),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+
+        query = f"SELECT {SUMMARY_COLUMNS} FROM results WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+
+        with self._lock:
+            rows = self._connect().execute(query, (*params, limit, offset)).fetchall()
+        return [self._summary(row) for row in rows]
+
+    @staticmethod
+    def _summary(row) -> Dict[str, Any]:
+        return {
+            "hash": row[0],
+            "model": row[1],
+            "document_type": row[2],
+            "confidence": row[3],
+            "created_at": row[4],
+            "size": row[5]
+        }
+
+    def _prune(self) -> None:
+        """
+        Retenção: remove resultados mais antigos que RESULT_STORE_RETENTION_DAYS
+        e, se o total ainda passar de RESULT_STORE_MAX_BYTES, os mais antigos
+        até caber (chamado com o lock)
+        """
+        connection = self._connection
+        removed = connection.execute(
+            "DELETE FROM results WHERE created_at < ?", (time.time() - self.retention,)
+        ).rowcount
+        removed += connection.execute(
+            """
+            DELETE FROM results WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY created_at DESC, key) AS total FROM results
+                ) WHERE total > ?
+            )
+            """,
+            (self.max_bytes,)
+        ).rowcount
+
+        if removed:
+            STORE_PRUNED.inc(removed)
+            # Devolve ao sistema as páginas liberadas
+            connection.execute("PRAGMA incremental_vacuum")
+            logger.info(f"Retenção do armazenamento: {removed} resultado(s) removido(s)")
+        self._bytes = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
@@ -0,0 +1,117 @@
+"""
+Transporte HTTP compartilhado com o Azure: uma sessão aiohttp com pool de
+conexões persistentes (keep-alive), contexto TLS único e métricas do pool,
+e o polling das operações de análise.
+"""
+import ssl
+from typing import Optional
+
+import aiohttp
+from azure.core.pipeline.policies import ContentDecodePolicy
+from azure.core.pipeline.transport import AioHttpTransport
+from azure.core.polling.async_base_polling import AsyncLROBasePolling
+from azure.core.polling.base_polling import (
+    BadResponse, LocationPolling, OperationResourcePolling, StatusCheckPolling
+)
+
+from app.metrics import registry
+
+HTTP_POOL_LIMIT = registry.gauge("ocr_http_pool_limit", "Máximo de conexões do pool HTTP com o Azure")
+HTTP_POOL_IN_USE = registry.gauge("ocr_http_pool_in_use", "Conexões do pool HTTP em uso")
+HTTP_POOL_IDLE = registry.gauge("ocr_http_pool_idle", "Conexões ociosas (keep-alive) no pool HTTP")
+HTTP_CONNECTIONS_CREATED = registry.counter(
+    "ocr_http_connections_created_total",
+    "Conexões novas abertas com o Azure (TCP + TLS)"
+)
+HTTP_CONNECTIONS_REUSED = registry.counter(
+    "ocr_http_connections_reused_total",
+    "Requisições atendidas por uma conexão reaproveitada do pool"
+)
+HTTP_POOL_WAITS = registry.counter(
+    "ocr_http_pool_waits_total",
+    "Requisições que aguardaram conexão livre no pool"
+)
+
+
+async def _on_connection_create_end(session, context, params) -> None:
+    HTTP_CONNECTIONS_CREATED.inc()
+
+
+async def _on_connection_reuseconn(session, context, params) -> None:
+    HTTP_CONNECTIONS_REUSED.inc()
+
+
+async def _on_connection_queued_start(session, context, params) -> None:
+    HTTP_POOL_WAITS.inc()
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_connection_queued_start.append(_on_connection_queued_start)
+    return trace_config
+
+
+def create_session(pool_size: int, keepalive_timeout: float,
+                   ssl_context: Optional[ssl.SSLContext] = None) -> aiohttp.ClientSession:
+    """
+    Cria a sessão aiohttp usada pelo SDK. Deve ser chamada com o event loop em execução.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_size,
+        keepalive_timeout=keepalive_timeout,
+        # Um único contexto TLS: certificados carregados uma vez para todas as conexões
+        ssl=ssl_context or ssl.create_default_context(),
+        ttl_dns_cache=300
+    )
+
+    HTTP_POOL_LIMIT.set(pool_size)
+    # Atributos internos do TCPConnector; zero se indisponíveis na versão instalada
+    HTTP_POOL_IN_USE.set_function(lambda: len(getattr(connector, "_acquired", ())))
+    HTTP_POOL_IDLE.set_function(
+        lambda: sum(len(conns) for conns in getattr(connector, "_conns", {}).values())
+    )
+
+    return aiohttp.ClientSession(connector=connector, trace_configs=[_trace_config()])
+
+
+def create_transport(session: aiohttp.ClientSession, connection_timeout: float,
+                     read_timeout: float) -> AioHttpTransport:
+    """Transporte do SDK sobre a sessão compartilhada (a sessão é fechada por quem a criou)"""
+    return AioHttpTransport(
+        session=session,
+        session_owner=False,
+        connection_timeout=connection_timeout,
+        read_timeout=read_timeout
+    )
+
+
+class DecodedBodyPolling(OperationResourcePolling):
+    """
+    Operation-Location com o status lido do corpo já decodificado pelo
+    pipeline (ContentDecodePolicy). O padrão faz um json.loads por chamada,
+    e a última resposta traz o AnalyzeResult inteiro (~0,2s por 3MB no
+    event loop); o resultado final vem da própria operação, sem outro GET.
+    """
+
+    def __init__(self):
+        super().__init__(lro_options={"final-state-via": "operation-location"})
+
+    def get_status(self, pipeline_response) -> str:
+        body = pipeline_response.context.get(ContentDecodePolicy.CONTEXT_NAME)
+        if not isinstance(body, dict):
+            return super().get_status(pipeline_response)
+        status = body.get("status")
+        if not status:
+            raise BadResponse("No status found in body")
+        return status
+
+
+def create_polling(interval: float, endpoint_url: str) -> AsyncLROBasePolling:
+    """Polling das análises (begin_analyze_document(polling=...))"""
+    return AsyncLROBasePolling(
+        interval,
+        lro_algorithms=[DecodedBodyPolling(), LocationPolling(), StatusCheckPolling()],
+        path_format_arguments={"endpoint": endpoint_url.rstrip("/")}
+    )
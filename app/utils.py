@@ -1,11 +1,103 @@
 import base64
+import hashlib
 import io
-from typing import Tuple
-import mimetypes
+from typing import AsyncIterator, Collection, Optional, Tuple
+import re
 
-def decode_base64_file(base64_string: str) -> Tuple[bytes, str]:
+# Tamanho dos blocos lidos de uploads binários
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Bytes iniciais suficientes para identificar o formato (base64: múltiplo de 4)
+SNIFF_BYTES = 18
+SNIFF_BASE64_CHARS = SNIFF_BYTES * 4 // 3
+# Espaços aceitos no base64 (quebras de linha MIME, "\n" final do `base64`)
+BASE64_WHITESPACE = (" ", "\t", "\r", "\n")
+
+# Assinaturas (magic bytes) dos formatos aceitos pelo Document Intelligence
+FILE_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"BM", "image/bmp"),
+)
+# Marcas do contêiner ISO BMFF (bytes 8-12, após "ftyp") usadas por HEIF/HEIC
+HEIF_BRANDS = {b"heic", b"heix", b"hevc", b"hevx", b"heim", b"heis", b"hevm", b"hevs", b"mif1", b"msf1"}
+
+class FileTooLargeError(ValueError):
+    """Arquivo excede o tamanho máximo permitido"""
+
+class UnsupportedFileTypeError(ValueError):
+    """Conteúdo do arquivo não corresponde a um formato suportado"""
+
+def detect_mime_type(file_data: bytes) -> Optional[str]:
+    """
+    Identifica o tipo MIME pelos primeiros bytes (magic bytes), sem copiar o buffer.
+    Retorna None se o formato não for reconhecido.
+    """
+    for signature, mime_type in FILE_SIGNATURES:
+        if file_data.startswith(signature):
+            return mime_type
+    if file_data.startswith(b"ftyp", 4) and file_data[8:12] in HEIF_BRANDS:
+        return "image/heif"
+    return None
+
+def check_mime_type(file_data: bytes, supported_types: Collection[str]) -> str:
+    """
+    Retorna o tipo MIME detectado, ou levanta UnsupportedFileTypeError
+    se o conteúdo não for de um formato suportado
+    """
+    mime_type = detect_mime_type(file_data)
+    if mime_type is None or mime_type not in supported_types:
+        raise UnsupportedFileTypeError(
+            f"Formato de arquivo não suportado. Suportados: {', '.join(supported_types)}"
+        )
+    return mime_type
+
+def matches_file_type(mime_type: str, file_type: str) -> bool:
+    """
+    Verifica se o tipo detectado corresponde ao file_type declarado (image/pdf)
+    """
+    file_type = getattr(file_type, "value", file_type)
+    if file_type == "pdf":
+        return mime_type == "application/pdf"
+    return mime_type.startswith("image/")
+
+def base64_length(data: str) -> int:
+    """
+    Quantidade de caracteres base64, sem contar espaços e quebras de linha
+    (sem copiar a string)
+    """
+    return len(data) - sum(data.count(char) for char in BASE64_WHITESPACE)
+
+def base64_head(data: str, chars: int) -> str:
+    """
+    Primeiros caracteres base64 (múltiplo de 4), ignorando espaços e
+    quebras de linha, para decodificar só o início do arquivo
+    """
+    head = "".join(data[:chars * 4].split())[:chars]
+    return head[:len(head) - len(head) % 4]
+
+def estimate_decoded_size(data: str) -> int:
+    """
+    Calcula o tamanho decodificado de uma string base64 sem decodificá-la
     """
-    Decodifica string base64 e retorna dados e tipo MIME
+    data = data.rstrip()
+    padding = 0
+    if data.endswith('=='):
+        padding = 2
+    elif data.endswith('='):
+        padding = 1
+    return (base64_length(data) * 3) // 4 - padding
+
+def decode_base64_file(base64_string: str, max_size: Optional[int] = None,
+                       supported_types: Optional[Collection[str]] = None) -> Tuple[bytes, str]:
+    """
+    Decodifica string base64 e retorna dados e tipo MIME detectado pelo conteúdo.
+    Se max_size for informado, rejeita payloads grandes antes de decodificar;
+    se supported_types for informado, rejeita formatos não suportados
+    decodificando apenas os primeiros bytes.
     """
     try:
         # Remove prefixo data: se existir
@@ -15,18 +107,32 @@ def decode_base64_file(base64_string: str) -> Tuple[bytes, str]:
         else:
             data = base64_string
             mime_type = None
+        data = data.strip()
+        
+        # Verificações aritméticas antes de alocar os bytes decodificados
+        if base64_length(data) % 4 == 1:
+            raise ValueError("comprimento inválido")
+        if max_size is not None and estimate_decoded_size(data) > max_size:
+            raise FileTooLargeError(f"Arquivo muito grande. Máximo: {max_size} bytes")
+        
+        # Identifica o formato pelo início do arquivo antes da decodificação completa;
+        # início vazio ou inválido é erro de base64 (400), não formato não suportado (415)
+        if supported_types is not None:
+            head = base64.b64decode(base64_head(data, SNIFF_BASE64_CHARS), validate=True)
+            if not head:
+                raise ValueError("conteúdo vazio")
+            check_mime_type(head, supported_types)
         
         # Decodifica base64
         file_data = base64.b64decode(data)
         
-        # Detecta tipo MIME se não fornecido
-        if not mime_type:
-            mime_type, _ = mimetypes.guess_type('file')
-            if not mime_type:
-                mime_type = 'application/octet-stream'
+        # O conteúdo prevalece sobre o prefixo data:
+        mime_type = detect_mime_type(file_data) or mime_type or 'application/octet-stream'
         
         return file_data, mime_type
         
+    except (FileTooLargeError, UnsupportedFileTypeError):
+        raise
     except Exception as e:
         raise ValueError(f"Erro ao decodificar base64: {str(e)}")
 
@@ -42,6 +148,59 @@ def validate_file_size(file_data: bytes, max_size: int) -> bool:
     """
     return len(file_data) <= max_size
 
+async def read_limited(chunks: AsyncIterator[bytes], max_size: int) -> bytes:
+    """
+    Lê um fluxo de bytes em blocos, abortando assim que o limite é excedido
+    """
+    parts = []
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_size:
+            raise FileTooLargeError(f"Arquivo muito grande. Máximo: {max_size} bytes")
+        parts.append(chunk)
+    return b"".join(parts)
+
+async def iter_upload_file(upload, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Itera sobre um UploadFile em blocos
+    """
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def content_hash(file_data: bytes) -> str:
+    """
+    Hash SHA-256 do conteúdo do arquivo
+    """
+    return hashlib.sha256(file_data).hexdigest()
+
+_PDF_PAGE_PATTERN = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PDF_COUNT_PATTERN = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+
+def count_pdf_pages(file_data: bytes) -> int:
+    """
+    Estima o número de páginas de um PDF sem bibliotecas externas: o maior
+    /Count dos nós /Pages (a raiz da árvore), conferido com os objetos
+    /Type /Page. Atualizações incrementais deixam cópias antigas desses
+    objetos no arquivo, então, se as contagens divergirem, retorna 0 (não
+    é possível estimar com segurança), assim como em objetos comprimidos.
+    """
+    if not file_data.startswith(b"%PDF"):
+        return 0
+    
+    pages = len(_PDF_PAGE_PATTERN.findall(file_data))
+    counts = [int(a or b) for a, b in _PDF_COUNT_PATTERN.findall(file_data)]
+    if not counts:
+        return pages
+    
+    count = max(counts)
+    if pages and pages != count:
+        return 0
+    return count
+
 def get_file_extension(mime_type: str) -> str:
     """
     Retorna extensão baseada no MIME type
@@ -49,6 +208,9 @@ def get_file_extension(mime_type: str) -> str:
     mime_to_ext = {
         'image/jpeg': '.jpg',
         'image/png': '.png',
+        'image/tiff': '.tiff',
+        'image/bmp': '.bmp',
+        'image/heif': '.heic',
         'application/pdf': '.pdf'
     }
     return mime_to_ext.get(mime_type, '.bin')
\ No newline at end of file
@@ -0,0 +1 @@
+# Benchmarks e servidor stub do Azure Document Intelligence (uso local)
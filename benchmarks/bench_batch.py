@@ -0,0 +1,78 @@
+"""
+Compara a vazão do /analyze/batch com chamadas sequenciais ao /analyze,
+usando o stub local.
+
+Uso:
+    python -m benchmarks.bench_batch --documents 40 --latency 0.5
+"""
+import argparse
+import base64
+import json
+import os
+import time
+
+import httpx
+
+from benchmarks.common import run_api, run_stub
+
+
+def make_documents(count: int) -> list:
+    # Conteúdos distintos para não acertar o cache
+    return [
+        {
+            "file_data": base64.b64encode(b"%PDF-1.4\n" + os.urandom(1024)).decode(),
+            "file_type": "pdf",
+            "model": "prebuilt-read"
+        }
+        for _ in range(count)
+    ]
+
+
+def run_sequential(client: httpx.Client, documents: list) -> float:
+    start = time.perf_counter()
+    for document in documents:
+        client.post("/analyze", json=document)
+    return time.perf_counter() - start
+
+
+def run_batch(client: httpx.Client, documents: list, concurrency: int) -> float:
+    start = time.perf_counter()
+    first_item = None
+    received = 0
+    payload = {"documents": documents, "max_concurrency": concurrency}
+    with client.stream("POST", "/analyze/batch", json=payload) as response:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            json.loads(line)
+            received += 1
+            if first_item is None:
+                first_item = time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    print(f"   primeiro item em {first_item:.2f}s, {received} itens recebidos")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do /analyze/batch")
+    parser.add_argument("--documents", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧪 {args.documents} documentos, latência do stub {args.latency}s")
+    print("=" * 60)
+
+    with run_stub(latency=args.latency) as endpoint:
+        with run_api(endpoint, env={"CACHE_ENABLED": "false", "BATCH_MAX_CONCURRENCY": str(args.concurrency)}) as (api_url, _):
+            with httpx.Client(base_url=api_url, timeout=600) as client:
+                sequential = run_sequential(client, make_documents(args.documents))
+                print(f"🐢 Sequencial: {sequential:.2f}s ({args.documents / sequential:.1f} docs/s)")
+
+                batch = run_batch(client, make_documents(args.documents), args.concurrency)
+                print(f"🚀 Lote (concorrência {args.concurrency}): {batch:.2f}s ({args.documents / batch:.1f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de concorrência do /analyze contra o stub local.
+
+Dispara N chamadas simultâneas e mede o tempo total. Com a análise
+assíncrona o tempo total fica próximo de uma latência do serviço, e o
+/health continua respondendo durante a carga.
+Em seguida analisa um layout grande (--large-pages): desserializar e
+processar o resultado custa CPU por página, e o /health só continua
+respondendo se esse trabalho ficar fora do event loop.
+
+Uso:
+    python -m benchmarks.bench_concurrency --concurrency 10 --latency 2 --large-pages 100
+"""
+import argparse
+import asyncio
+import base64
+import time
+
+import httpx
+
+from benchmarks.common import run_api, run_stub
+
+# PNG 1x1 usado como documento de teste
+SAMPLE_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+
+
+def make_payload(index: int, model: str = "prebuilt-read") -> dict:
+    # Conteúdos distintos: nem o cache nem a deduplicação agrupam as chamadas
+    file_data = base64.b64decode(SAMPLE_PNG) + index.to_bytes(4, "big")
+    return {
+        "file_data": base64.b64encode(file_data).decode(),
+        "file_type": "image",
+        "model": model,
+        "options": {"raw_response": "none"}
+    }
+
+
+async def run_load(api_url: str, payloads: list, probe_interval: float = 0.2) -> None:
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=600) as client:
+        health_times = []
+
+        async def probe_health(stop: asyncio.Event) -> None:
+            while not stop.is_set():
+                start = time.perf_counter()
+                await client.get("/health")
+                health_times.append(time.perf_counter() - start)
+                await asyncio.sleep(probe_interval)
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(stop))
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[client.post("/analyze", json=payload) for payload in payloads])
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        await probe
+
+        metrics = (await client.get("/metrics")).text
+
+    ok = sum(1 for r in responses if r.status_code == 200 and r.json().get("success"))
+    print(f"✅ Sucesso: {ok}/{len(payloads)}")
+    print(f"⏱️ Tempo total: {elapsed:.2f}s")
+    if health_times:
+        median = sorted(health_times)[len(health_times) // 2]
+        print(f"💓 /health durante a carga: mediana {median * 1000:.1f}ms, "
+              f"máx {max(health_times) * 1000:.1f}ms ({len(health_times)} chamadas)")
+    pool_lines = [line for line in metrics.splitlines() if line.startswith("ocr_http_")]
+    if pool_lines:
+        print("🔌 Pool HTTP com o Azure:")
+        for line in pool_lines:
+            print(f"   {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência do /analyze")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--large-pages", type=int, default=100, help="Páginas do layout grande (0 desativa)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧪 {args.concurrency} chamadas simultâneas, latência do stub {args.latency}s")
+    print("=" * 60)
+
+    with run_stub(latency=args.latency) as endpoint:
+        with run_api(endpoint) as (api_url, _):
+            asyncio.run(run_load(api_url, [make_payload(index) for index in range(args.concurrency)]))
+
+    if args.large_pages:
+        print("=" * 60)
+        print(f"🧪 Layout de {args.large_pages} páginas (desserialização e processamento do resultado)")
+        print("=" * 60)
+        with run_stub(latency=args.latency, pages=args.large_pages) as endpoint:
+            with run_api(endpoint, env={"CACHE_ENABLED": "false"}) as (api_url, _):
+                asyncio.run(run_load(api_url, [make_payload(0, "prebuilt-layout")], probe_interval=0.05))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Compara a extração de campos por mapa declarativo (app.extraction) com a
+abordagem anterior (dicionário por modelo e _extract_field_value com
+hasattr), incluindo a serialização da resposta, em resultados do stub.
+
+Uso:
+    python -m benchmarks.bench_extraction --items 100 --iterations 200
+"""
+import argparse
+import time
+
+from app.extraction import FIELD_MAPS, extract_document
+from app.serialization import dumps
+from benchmarks.common import load_analyze_result
+from benchmarks.stub_payloads import invoice_document, receipt_document
+from benchmarks.stub_server import build_analyze_result
+
+
+def extract_field_value_hasattr(field):
+    """Implementação anterior de AzureOCRService._extract_field_value"""
+    if hasattr(field, 'value'):
+        if hasattr(field.value, 'amount'):
+            return field.value.amount
+        return field.value
+    return None
+
+
+def extract_document_hasattr(result, model: str) -> dict:
+    """Abordagem anterior: um fields_map por modelo, sondando cada campo"""
+    extracted = {}
+    fields_map = {
+        azure_field: spec if isinstance(spec, str) else spec[0]
+        for azure_field, spec in FIELD_MAPS[model].items()
+    }
+    if result.documents:
+        doc = result.documents[0]
+        if doc.fields:
+            for azure_field, our_field in fields_map.items():
+                if azure_field in doc.fields:
+                    field = doc.fields[azure_field]
+                    extracted[our_field] = {
+                        "value": extract_field_value_hasattr(field),
+                        "confidence": field.confidence
+                    }
+    return extracted
+
+
+def measure(function, result, model: str, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        payload = dumps(function(result, model))
+    return (time.perf_counter() - start) / iterations, len(payload)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extração declarativa vs hasattr")
+    parser.add_argument("--items", type=int, default=100, help="Itens da fatura")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = []
+    for model, document in (
+        ("prebuilt-receipt", receipt_document(items=20)),
+        ("prebuilt-invoice", invoice_document(items=args.items)),
+    ):
+        payload = build_analyze_result(model, pages=1)
+        payload["documents"] = [{**document, "boundingRegions": [], "spans": []}]
+        cases.append((model, load_analyze_result(payload)))
+
+    print("=" * 60)
+    print(f"🧪 Extração + serialização ({args.iterations} iterações)")
+    print("=" * 60)
+    for model, result in cases:
+        old_time, old_size = measure(extract_document_hasattr, result, model, args.iterations)
+        new_time, new_size = measure(extract_document, result, model, args.iterations)
+        print(f"{model}")
+        print(f"   hasattr + to_dict: {old_time * 1000:>7.2f} ms  {old_size / 1024:>7.1f} KB")
+        print(f"   mapa declarativo:  {new_time * 1000:>7.2f} ms  {new_size / 1024:>7.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
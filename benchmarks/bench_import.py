@@ -0,0 +1,72 @@
+"""
+Resume o `python -X importtime` da importação de app.main: tempo total,
+pacotes mais caros (soma do tempo próprio dos seus módulos) e o custo
+adiado do SDK do Azure (load_azure_sdk, pago no startup ou no mestre do
+gunicorn).
+Roda sem DI_ENDPOINT/DI_KEY, como um container sem credenciais.
+
+Uso:
+    python -m benchmarks.bench_import --runs 5 --top 10
+"""
+import argparse
+import collections
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from benchmarks.common import ROOT_DIR
+
+CASES = {
+    "import app.main": "import app.main",
+    "+ load_azure_sdk()": "import app.main; from app.ocr_service import load_azure_sdk; load_azure_sdk()",
+}
+
+
+def import_times(code: str) -> Tuple[int, Dict[str, int]]:
+    """Executa o código com -X importtime; retorna (total em µs, tempo próprio somado por pacote de topo)"""
+    env = {key: value for key, value in os.environ.items() if key not in ("DI_ENDPOINT", "DI_KEY")}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stderr
+
+    packages: Dict[str, int] = collections.Counter()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_time, _, name = line[len("import time:"):].split("|")
+            packages[name.strip().split(".")[0]] += int(self_time)
+        except ValueError:
+            continue  # cabeçalho
+    return sum(packages.values()), packages
+
+
+def median(values: List[int]) -> int:
+    return sorted(values)[len(values) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tempo de importação da aplicação (-X importtime)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧪 Importação da aplicação (mediana de {args.runs} execuções)")
+    print("=" * 60)
+    for title, code in CASES.items():
+        runs = [import_times(code) for _ in range(args.runs)]
+        total = median([run[0] for run in runs])
+        packages = {
+            package: median([run[1].get(package, 0) for run in runs])
+            for package in runs[0][1]
+        }
+        print(f"{title:<22} {total / 1000:>8.0f}ms")
+        for package, own_time in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"   {package:<22} {own_time / 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
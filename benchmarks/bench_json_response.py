@@ -0,0 +1,76 @@
+"""
+Micro-benchmark da serialização da resposta do /analyze para um
+resultado de layout grande: caminho padrão do FastAPI (validação Pydantic
++ jsonable_encoder + json.dumps) vs payload confiável + orjson.
+
+Uso:
+    python -m benchmarks.bench_json_response --pages 50
+    python -m benchmarks.bench_json_response --result resultado_gravado.json
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("DI_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("DI_KEY", "stub-key")
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models import AnalysisResponse
+from app.ocr_service import AzureOCRService
+from app.serialization import dumps, response_payload
+from benchmarks.common import load_analyze_result
+from benchmarks.stub_server import build_analyze_result
+
+
+def fastapi_default(result: dict) -> bytes:
+    response = AnalysisResponse(**result)
+    return json.dumps(jsonable_encoder(response), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast_path(result: dict) -> bytes:
+    return dumps(response_payload(AnalysisResponse, result))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CPU de serialização da resposta do /analyze")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--result", help="AnalyzeResult gravado (JSON no formato REST)")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.result:
+        with open(args.result) as f:
+            payload = json.load(f)
+        payload = payload.get("analyzeResult", payload)
+    else:
+        payload = build_analyze_result("prebuilt-layout", args.pages)
+
+    service = AzureOCRService()
+    analyze_result = load_analyze_result(payload)
+    result = {
+        "success": True,
+        "extracted_data": service._process_result(analyze_result, "prebuilt-layout"),
+        "raw_response": service._serialize_result(analyze_result),
+        "processing_time": 1.0
+    }
+
+    print("=" * 60)
+    print(f"🧪 Serialização de resposta de layout ({args.iterations} iterações)")
+    print("=" * 60)
+
+    timings = {}
+    for label, function in (("FastAPI padrão", fastapi_default), ("orjson sem revalidar", fast_path)):
+        start = time.process_time()
+        for _ in range(args.iterations):
+            body = function(result)
+        timings[label] = (time.process_time() - start) / args.iterations * 1000
+        print(f"{label:<22} {len(body) / 1024:>9.1f}KB  CPU {timings[label]:>7.1f}ms/requisição")
+
+    saved = timings["FastAPI padrão"] - timings["orjson sem revalidar"]
+    print(f"💡 Economia: {saved:.1f}ms de CPU por requisição")
+
+
+if __name__ == "__main__":
+    main()
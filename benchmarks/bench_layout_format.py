@@ -0,0 +1,96 @@
+"""
+Compara o formato de layout atual (um objeto por linha e por célula) com o
+compacto (arrays paralelos e matrizes por linha): pico de alocação durante
+o processamento, tamanho do JSON e tempo de CPU, em um layout sintético do
+stub e em um demonstrativo financeiro com uma tabela grande.
+
+Uso:
+    python -m benchmarks.bench_layout_format --pages 50 --rows 400
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("DI_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("DI_KEY", "stub-key")
+
+from app.models import LayoutFormat
+from app.ocr_service import AzureOCRService
+from app.serialization import dumps
+from benchmarks.common import load_analyze_result
+from benchmarks.stub_server import build_analyze_result
+
+STATEMENT_COLUMNS = ["Conta", "Nota", "2024", "2023", "Variação", "AV %", "AH %", "Moeda"]
+
+
+def statement_table(rows: int) -> dict:
+    """Tabela de demonstrativo: cabeçalho, muitos zeros, traços e moeda repetidos"""
+    cells = []
+    for row in range(rows):
+        for column, header in enumerate(STATEMENT_COLUMNS):
+            if row == 0:
+                content = header
+            elif column == 0:
+                content = f"Conta contábil {row}"
+            elif column == 7:
+                content = "BRL"
+            elif row % 3 == 0:
+                content = "0,00" if column > 1 else "-"
+            else:
+                content = f"{row * column * 1000:,},00".replace(",", ".")
+            cells.append({
+                "kind": "columnHeader" if row == 0 else "content",
+                "rowIndex": row,
+                "columnIndex": column,
+                "content": content,
+                "boundingRegions": [],
+                "spans": []
+            })
+    return {"rowCount": rows, "columnCount": len(STATEMENT_COLUMNS), "cells": cells, "boundingRegions": [], "spans": []}
+
+
+def measure(service: AzureOCRService, result, layout_format: LayoutFormat, iterations: int):
+    tracemalloc.start()
+    extracted = service._process_layout(result, layout_format)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del extracted
+
+    start = time.process_time()
+    for _ in range(iterations):
+        payload = dumps(service._process_layout(result, layout_format))
+    cpu = (time.process_time() - start) / iterations
+    return peak, len(payload), cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Formato de layout: objects vs compact")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=400, help="Linhas da tabela do demonstrativo")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    service = AzureOCRService()
+    statement = build_analyze_result("prebuilt-layout", pages=2)
+    statement["tables"].append(statement_table(args.rows))
+    cases = [
+        (f"Layout do stub, {args.pages} páginas", load_analyze_result(build_analyze_result("prebuilt-layout", args.pages))),
+        (f"Demonstrativo, tabela {args.rows}x{len(STATEMENT_COLUMNS)}", load_analyze_result(statement)),
+    ]
+
+    print("=" * 60)
+    print(f"🧪 Formato de layout ({args.iterations} iterações)")
+    print("=" * 60)
+    for title, result in cases:
+        print(title)
+        for layout_format in LayoutFormat:
+            peak, size, cpu = measure(service, result, layout_format, args.iterations)
+            print(
+                f"   {layout_format.value:<8} alocação {peak / 1024:>8.1f}KB  "
+                f"JSON {size / 1024:>8.1f}KB  CPU {cpu * 1000:>6.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Mede o pré-processamento de imagens: redução de bytes, custo de CPU e
+latência ponta a ponta com upload limitado, além da diferença de confiança
+média das palavras entre a imagem original e a reduzida.
+
+Com o stub a confiança é fixa (diferença 0); para medir a diferença real,
+aponte para um recurso do Azure com --endpoint/--key e use uma foto real.
+
+Uso:
+    python -m benchmarks.bench_preprocess
+    python -m benchmarks.bench_preprocess --image recibo.jpg --endpoint https://... --key ...
+"""
+import argparse
+import base64
+import contextlib
+import io
+import random
+import statistics
+import time
+
+import httpx
+from PIL import Image, ImageDraw
+
+from app.preprocessing import preprocess_image
+from benchmarks.common import run_api, run_stub
+
+
+def make_photo(width: int = 4000, height: int = 3000) -> bytes:
+    """Foto sintética de um recibo: papel com ruído, texto e fundo colorido"""
+    rng = random.Random(42)
+    image = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(image, Image.new("RGB", (width, height), (168, 142, 110)), 0.6)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((width // 4, height // 10, width * 3 // 4, height * 9 // 10), fill=(238, 236, 230))
+    for line in range(60):
+        y = height // 10 + 40 + line * 40
+        text = f"ITEM {line:02d}  PRODUTO {rng.randint(1000, 9999)}  R$ {rng.uniform(1, 99):.2f}"
+        draw.text((width // 4 + 60, y), text, fill=(30, 30, 30))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=95)
+    return output.getvalue()
+
+
+def mean_word_confidence(body: dict) -> float:
+    """Confiança média das palavras no raw_response"""
+    confidences = [
+        word["confidence"]
+        for page in (body.get("raw_response") or {}).get("pages", [])
+        for word in page.get("words") or []
+        if word.get("confidence") is not None
+    ]
+    return statistics.fmean(confidences) if confidences else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pré-processamento de imagens")
+    parser.add_argument("--image", help="Imagem a usar (padrão: foto sintética 4000x3000)")
+    parser.add_argument("--max-pixels", type=int, default=4_000_000)
+    parser.add_argument("--quality", type=int, default=85)
+    parser.add_argument("--bandwidth", type=float, default=2_000_000, help="Upload simulado no stub (bytes/s)")
+    parser.add_argument("--model", default="prebuilt-read")
+    parser.add_argument("--endpoint", help="Endpoint real do Azure (padrão: stub local)")
+    parser.add_argument("--key", help="Chave do recurso do Azure")
+    args = parser.parse_args()
+
+    if args.image:
+        with open(args.image, "rb") as image_file:
+            original = image_file.read()
+    else:
+        original = make_photo()
+
+    print("=" * 60)
+    print("🧪 Pré-processamento de imagens")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    processed = preprocess_image(original, args.max_pixels, args.quality) or original
+    cpu_time = time.perf_counter() - start
+    print(f"📦 Original:      {len(original) / 1024:>8.0f} KB")
+    print(f"📦 Pré-processado: {len(processed) / 1024:>7.0f} KB  ({1 - len(processed) / len(original):.0%} menor)")
+    print(f"⏱️  Custo do pré-processamento: {cpu_time * 1000:.0f} ms")
+
+    if args.endpoint:
+        stub = contextlib.nullcontext(args.endpoint)
+        api_env = {"DI_KEY": args.key or ""}
+    else:
+        stub = run_stub(latency=0.5, bandwidth=args.bandwidth)
+        api_env = {}
+    api_env.update({
+        "CACHE_ENABLED": "false",
+        "PREPROCESS_MAX_PIXELS": str(args.max_pixels),
+        "PREPROCESS_QUALITY": str(args.quality)
+    })
+
+    file_base64 = base64.b64encode(original).decode()
+    with stub as endpoint:
+        with run_api(endpoint, env=api_env) as (api_url, _):
+            with httpx.Client(base_url=api_url, timeout=300) as client:
+                confidences = {}
+                for label, preprocess in (("Original", False), ("Pré-processado", True)):
+                    start = time.perf_counter()
+                    response = client.post("/analyze", json={
+                        "file_data": file_base64,
+                        "file_type": "image",
+                        "model": args.model,
+                        "options": {"preprocess": preprocess, "raw_response": "full"}
+                    })
+                    elapsed = time.perf_counter() - start
+                    body = response.json()
+                    confidences[label] = mean_word_confidence(body)
+                    print(f"{label:<15} {elapsed:>6.2f}s  sucesso: {body.get('success')}  "
+                          f"confiança média: {confidences[label]:.4f}")
+
+    delta = confidences["Pré-processado"] - confidences["Original"]
+    print(f"📉 Diferença de confiança: {delta:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
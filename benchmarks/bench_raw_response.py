@@ -0,0 +1,49 @@
+"""
+Mede o tamanho da resposta e o tempo de CPU de serialização do /analyze
+para cada modo de raw_response (full, compact, none), usando um resultado
+de layout sintético gerado pelo stub.
+
+Uso:
+    python -m benchmarks.bench_raw_response --pages 50
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DI_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("DI_KEY", "stub-key")
+
+from app.models import AnalysisResponse, RawResponseMode
+from app.ocr_service import AzureOCRService
+from benchmarks.common import load_analyze_result
+from benchmarks.stub_server import build_analyze_result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tamanho e CPU da resposta por modo de raw_response")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    service = AzureOCRService()
+    result = load_analyze_result(build_analyze_result("prebuilt-layout", args.pages))
+
+    print("=" * 60)
+    print(f"🧪 Layout com {args.pages} páginas, {args.iterations} iterações")
+    print("=" * 60)
+
+    for mode in RawResponseMode:
+        start = time.process_time()
+        for _ in range(args.iterations):
+            body = AnalysisResponse(
+                success=True,
+                extracted_data=service._process_result(result, "prebuilt-layout"),
+                raw_response=service._serialize_result(result, mode),
+                processing_time=0.0
+            ).model_dump_json()
+        cpu_ms = (time.process_time() - start) / args.iterations * 1000
+        print(f"{mode.value:<8} {len(body) / 1024:>10.1f}KB  CPU {cpu_ms:>8.1f}ms/requisição")
+
+
+if __name__ == "__main__":
+    main()
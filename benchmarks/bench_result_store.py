@@ -0,0 +1,79 @@
+"""
+Mede o armazenamento persistente de resultados (app.store): tempo de
+gravação, de leitura por chave e de listagem filtrada, e a taxa de
+compressão, com respostas de layout geradas pelo stub.
+
+Uso:
+    python -m benchmarks.bench_result_store --results 500 --pages 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DI_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("DI_KEY", "stub-key")
+
+from app.models import RawResponseMode
+from app.ocr_service import AzureOCRService
+from app.serialization import dumps
+from app.store import ResultStore
+from benchmarks.common import load_analyze_result
+from benchmarks.stub_server import build_analyze_result
+
+
+async def run(args: argparse.Namespace, path: str) -> None:
+    service = AzureOCRService()
+    result = load_analyze_result(build_analyze_result("prebuilt-layout", args.pages))
+    response = {
+        "success": True,
+        "model": "prebuilt-layout",
+        "extracted_data": service._process_result(result, "prebuilt-layout"),
+        "raw_response": service._serialize_result(result, RawResponseMode.COMPACT),
+        "processing_time": 1.0
+    }
+    raw_size = len(dumps(response))
+
+    store = ResultStore(path, retention_days=30, max_bytes=1 << 40)
+    keys = [f"{index:064x}:prebuilt-layout:options" for index in range(args.results)]
+
+    start = time.perf_counter()
+    for index, key in enumerate(keys):
+        document_type = "invoice" if index % 4 == 0 else None
+        await store.save(key, key[:64], {**response, "document_type": document_type})
+    save_time = (time.perf_counter() - start) / args.results
+
+    start = time.perf_counter()
+    for key in keys:
+        await store.get(key)
+    get_time = (time.perf_counter() - start) / args.results
+
+    start = time.perf_counter()
+    for _ in range(100):
+        listed = await store.search(document_type="invoice", limit=50)
+    search_time = (time.perf_counter() - start) / 100
+    store.close()
+
+    print(f"Resposta: {raw_size / 1024:.1f}KB em JSON, {store._bytes / args.results / 1024:.1f}KB comprimida")
+    print(f"Banco:    {os.path.getsize(path) / 1024 / 1024:.1f}MB para {args.results} resultados")
+    print(f"Gravação: {save_time * 1000:>6.2f} ms")
+    print(f"Leitura:  {get_time * 1000:>6.2f} ms (por chave)")
+    print(f"Listagem: {search_time * 1000:>6.2f} ms ({len(listed)} por document_type)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Armazenamento persistente de resultados")
+    parser.add_argument("--results", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=5)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧪 {args.results} resultados de layout com {args.pages} páginas")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        asyncio.run(run(args, os.path.join(directory, "results.db")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Compara a análise de um PDF grande em uma única operação com o modo
+split_pages (blocos de páginas em paralelo), usando o stub com latência
+proporcional ao número de páginas.
+
+Uso:
+    python -m benchmarks.bench_split --pages 60 --split 10
+"""
+import argparse
+import base64
+import time
+
+import httpx
+
+from benchmarks.common import run_api, run_stub
+
+
+def make_pdf(pages: int) -> bytes:
+    """PDF sintético com N objetos de página (suficiente para a contagem)"""
+    objects = b"".join(b"%d 0 obj << /Type /Page >> endobj\n" % (number + 2) for number in range(pages))
+    header = b"%PDF-1.4\n" + b"1 0 obj << /Type /Pages /Count %d >> endobj\n" % pages
+    return header + objects + b"%%EOF\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Análise única vs split_pages")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--split", type=int, default=10)
+    parser.add_argument("--page-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    file_base64 = base64.b64encode(make_pdf(args.pages)).decode()
+
+    print("=" * 60)
+    print(f"🧪 PDF de {args.pages} páginas, {args.page_latency}s por página no stub")
+    print("=" * 60)
+
+    with run_stub(latency=0.2, pages=args.pages, page_latency=args.page_latency, tables=False) as endpoint:
+        with run_api(endpoint, env={"CACHE_ENABLED": "false"}) as (api_url, _):
+            with httpx.Client(base_url=api_url, timeout=600) as client:
+                for label, options in (
+                    ("Operação única", {"raw_response": "none"}),
+                    (f"split_pages={args.split}", {"raw_response": "none", "split_pages": args.split})
+                ):
+                    start = time.perf_counter()
+                    response = client.post("/analyze", json={
+                        "file_data": file_base64,
+                        "file_type": "pdf",
+                        "model": "prebuilt-layout",
+                        "options": options
+                    })
+                    elapsed = time.perf_counter() - start
+                    extracted = response.json().get("extracted_data") or {}
+                    page_numbers = [page["page_number"] for page in extracted.get("pages", [])]
+                    in_order = page_numbers == list(range(1, args.pages + 1))
+                    print(f"{label:<18} {elapsed:>6.2f}s  páginas: {len(page_numbers)} (ordem correta: {in_order})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Mede o tempo até a API aceitar tráfego em cada modo de execução: um
+processo uvicorn, gunicorn sem preload e gunicorn com preload (modo de
+produção, app/gunicorn_conf.py). Para cada modo: primeiro /health com
+sucesso, todos os workers prontos, memória (PSS somada dos processos) e
+latência da primeira e da segunda análise contra o stub.
+
+Uso:
+    python -m benchmarks.bench_startup --workers 4
+"""
+import argparse
+import base64
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import API_PORT, ROOT_DIR, run_stub
+from benchmarks.load_test import SAMPLE_PNG
+
+STARTUP_LINE = "Application startup complete"
+
+
+def children(pid: int) -> List[int]:
+    """Processos filhos diretos (Linux)"""
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def pss_kb(pid: int) -> int:
+    """Memória proporcional (PSS): páginas compartilhadas após o fork contam uma vez no total"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def measure(command: List[str], env: Dict[str, str], workers: int, url: str) -> Dict[str, float]:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m"] + command,
+        cwd=ROOT_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    ready = []
+    all_ready = threading.Event()
+
+    def watch_logs() -> None:
+        for line in process.stderr:
+            if STARTUP_LINE in line:
+                ready.append(time.perf_counter() - start)
+                if len(ready) == workers:
+                    all_ready.set()
+
+    threading.Thread(target=watch_logs, daemon=True).start()
+    try:
+        first_health = None
+        while first_health is None:
+            try:
+                if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                    first_health = time.perf_counter() - start
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        if not all_ready.wait(timeout=60):
+            raise RuntimeError("Workers não ficaram prontos a tempo")
+
+        analyses = []
+        for index in range(2):
+            body = {
+                "file_data": base64.b64encode(SAMPLE_PNG + bytes([index])).decode(),
+                "file_type": "image",
+                "model": "prebuilt-read",
+                "options": {"raw_response": "none"}
+            }
+            analysis_start = time.perf_counter()
+            httpx.post(f"{url}/analyze", json=body, timeout=60).raise_for_status()
+            analyses.append(time.perf_counter() - analysis_start)
+
+        pids = [process.pid] + children(process.pid)
+        return {
+            "first_health": first_health,
+            "all_ready": ready[-1],
+            "pss_mb": sum(pss_kb(pid) for pid in pids) / 1024,
+            "first_analysis": analyses[0],
+            "second_analysis": analyses[1]
+        }
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tempo de inicialização por modo de execução")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3, help="Execuções por modo (mediana)")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{API_PORT}"
+    gunicorn = ["gunicorn", "app.main:app", "-c", "app/gunicorn_conf.py"]
+    modes = [
+        ("uvicorn (1 processo)", ["uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(API_PORT)], {}, 1),
+        (f"gunicorn {args.workers}w sem preload", gunicorn, {"PRELOAD_APP": "false"}, args.workers),
+        (f"gunicorn {args.workers}w com preload", gunicorn, {"PRELOAD_APP": "true"}, args.workers),
+    ]
+
+    print("=" * 86)
+    print(f"🧪 Inicialização da API (mediana de {args.runs} execuções)")
+    print("=" * 86)
+    print(f"{'modo':<28} {'1º /health':>10} {'workers ok':>11} {'PSS':>8} {'1ª análise':>11} {'2ª análise':>11}")
+
+    with run_stub(latency=0.1, pages=1) as endpoint:
+        env = {
+            "DI_ENDPOINT": endpoint,
+            "DI_KEY": "stub-key",
+            "DI_POLLING_INTERVAL": "0.05",
+            "CACHE_ENABLED": "false",
+            # Jobs exigem um único worker; o uvicorn os teria habilitados por padrão
+            "JOBS_ENABLED": "false",
+            "BIND": f"127.0.0.1:{API_PORT}",
+        }
+        for title, command, mode_env, workers in modes:
+            runs = [measure(command, {**env, **mode_env, "WEB_CONCURRENCY": str(workers)}, workers, url)
+                    for _ in range(args.runs)]
+            median = {key: sorted(run[key] for run in runs)[len(runs) // 2] for key in runs[0]}
+            print(
+                f"{title:<28} {median['first_health'] * 1000:>8.0f}ms {median['all_ready'] * 1000:>9.0f}ms "
+                f"{median['pss_mb']:>6.0f}MB {median['first_analysis'] * 1000:>9.0f}ms "
+                f"{median['second_analysis'] * 1000:>9.0f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compara /analyze e /analyze/stream para um PDF grande (layout): tempo até
+o primeiro byte, tempo total, tamanho e pico de memória (RSS) da API.
+O /analyze usa raw_response=none, já que o stream não traz a resposta
+bruta: a comparação é só entre o documento montado e as linhas NDJSON.
+
+Uso:
+    python -m benchmarks.bench_stream --pages 100
+"""
+import argparse
+import time
+
+import httpx
+
+from benchmarks.common import peak_rss_kb, run_api, run_stub
+
+PAYLOAD = {
+    "file_data": "JVBERi0xLjQK",
+    "file_type": "pdf",
+    "model": "prebuilt-layout",
+    "options": {"raw_response": "none"}
+}
+
+
+def measure(endpoint: str, label: str, path: str) -> None:
+    with run_api(endpoint, env={"CACHE_ENABLED": "false"}) as (api_url, process):
+        before = peak_rss_kb(process.pid)
+        start = time.perf_counter()
+        first_byte = None
+        size = 0
+        with httpx.stream("POST", f"{api_url}{path}", json=PAYLOAD, timeout=600) as response:
+            for chunk in response.iter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                size += len(chunk)
+        total = time.perf_counter() - start
+        after = peak_rss_kb(process.pid)
+
+    print(f"{label:<16} TTFB {first_byte:>6.2f}s  total {total:>6.2f}s  "
+          f"{size / 1024:>8.1f}KB  pico RSS +{(after - before) / 1024:.1f}MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resposta completa vs streaming de layout")
+    parser.add_argument("--pages", type=int, default=100)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"🧪 Layout com {args.pages} páginas")
+    print("=" * 60)
+
+    with run_stub(latency=0.1, pages=args.pages) as endpoint:
+        measure(endpoint, "/analyze", "/analyze")
+        measure(endpoint, "/analyze/stream", "/analyze/stream")
+
+
+if __name__ == "__main__":
+    main()
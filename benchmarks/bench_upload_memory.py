@@ -0,0 +1,65 @@
+"""
+Compara o pico de memória (RSS) por requisição entre o /analyze (JSON com
+base64) e o /analyze/upload (binário).
+
+Cada caminho roda em um processo novo da API para que o pico medido
+(VmHWM) reflita apenas a requisição. Requer Linux (/proc).
+
+Uso:
+    python -m benchmarks.bench_upload_memory --size-mb 8
+"""
+import argparse
+import base64
+import os
+
+import httpx
+
+from benchmarks.common import peak_rss_kb, run_api, run_stub
+
+
+def measure(endpoint: str, label: str, send) -> None:
+    with run_api(endpoint) as (api_url, process):
+        with httpx.Client(base_url=api_url, timeout=120) as client:
+            client.get("/health")
+            before = peak_rss_kb(process.pid)
+            response = send(client)
+            after = peak_rss_kb(process.pid)
+
+    ok = response.status_code == 200 and response.json().get("success")
+    print(f"{label:<28} status={response.status_code} ok={bool(ok)} "
+          f"pico RSS: {before / 1024:.1f}MB -> {after / 1024:.1f}MB "
+          f"(+{(after - before) / 1024:.1f}MB)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pico de RSS por requisição: JSON vs upload binário")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    args = parser.parse_args()
+
+    file_data = b"%PDF-1.4\n" + os.urandom(int(args.size_mb * 1024 * 1024))
+    file_base64 = base64.b64encode(file_data).decode()
+
+    print("=" * 60)
+    print(f"🧪 Documento de {args.size_mb}MB")
+    print("=" * 60)
+
+    with run_stub(latency=0.1) as endpoint:
+        measure(endpoint, "/analyze (JSON + base64)", lambda client: client.post(
+            "/analyze",
+            json={"file_data": file_base64, "file_type": "pdf", "model": "prebuilt-read"}
+        ))
+        measure(endpoint, "/analyze/upload (multipart)", lambda client: client.post(
+            "/analyze/upload",
+            params={"model": "prebuilt-read"},
+            files={"file": ("document.pdf", file_data, "application/pdf")}
+        ))
+        measure(endpoint, "/analyze/upload (octet)", lambda client: client.post(
+            "/analyze/upload",
+            params={"model": "prebuilt-read"},
+            content=file_data,
+            headers={"Content-Type": "application/octet-stream"}
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Utilitários compartilhados pelos benchmarks: sobe o stub do Azure e a API
+em subprocessos e espera até que estejam respondendo.
+"""
+import contextlib
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STUB_PORT = 9000
+API_PORT = 8100
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    """Espera até que a URL responda (qualquer status HTTP)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Servidor não respondeu a tempo: {url}")
+
+
+@contextlib.contextmanager
+def run_process(args: List[str], ready_url: str, env: Optional[Dict[str, str]] = None) -> Iterator[subprocess.Popen]:
+    """Executa um processo Python e o encerra ao final"""
+    process_env = dict(os.environ)
+    process_env.update(env or {})
+    process = subprocess.Popen(
+        [sys.executable] + args,
+        cwd=ROOT_DIR,
+        env=process_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(ready_url)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+@contextlib.contextmanager
+def run_stub(latency: float = 2.0, pages: int = 1, port: int = STUB_PORT, **extra: str) -> Iterator[str]:
+    """Sobe o stub do Document Intelligence e retorna seu endpoint"""
+    env = {"STUB_LATENCY": str(latency), "STUB_PAGES": str(pages)}
+    env.update({f"STUB_{key.upper()}": str(value).lower() for key, value in extra.items()})
+    endpoint = f"http://127.0.0.1:{port}"
+    args = ["-m", "benchmarks.stub_server", "--port", str(port), "--latency", str(latency), "--pages", str(pages)]
+    with run_process(args, f"{endpoint}/docs", env):
+        yield endpoint
+
+
+def load_analyze_result(payload: dict):
+    """Converte um AnalyzeResult no formato REST (ex.: do stub) no objeto do SDK"""
+    from azure.ai.formrecognizer import AnalyzeResult
+    from azure.ai.formrecognizer._generated.v2023_07_31.models import AnalyzeResult as GeneratedAnalyzeResult
+
+    return AnalyzeResult._from_generated(GeneratedAnalyzeResult.deserialize(payload))
+
+
+@contextlib.contextmanager
+def run_api(endpoint: str, port: int = API_PORT, env: Optional[Dict[str, str]] = None) -> Iterator[Tuple[str, subprocess.Popen]]:
+    """Sobe a API apontando para o endpoint informado; retorna (url, processo)"""
+    api_env = {
+        "DI_ENDPOINT": endpoint,
+        "DI_KEY": "stub-key",
+        "DI_POLLING_INTERVAL": "0.1"
+    }
+    api_env.update(env or {})
+    url = f"http://127.0.0.1:{port}"
+    args = ["-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    with run_process(args, f"{url}/health", api_env) as process:
+        yield url, process
+
+
+def _proc_status_kb(pid: int, field: str) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def peak_rss_kb(pid: int) -> int:
+    """Pico de memória residente (VmHWM) do processo, em KB (Linux)"""
+    return _proc_status_kb(pid, "VmHWM:")
+
+
+def rss_kb(pid: int) -> int:
+    """Memória residente atual (VmRSS) do processo, em KB (Linux)"""
+    return _proc_status_kb(pid, "VmRSS:")
@@ -0,0 +1,145 @@
+"""
+Teste de carga reprodutível do /analyze contra o stub local do Azure.
+
+Para cada nível de concorrência, N clientes enviam requisições em laço
+fechado durante um tempo fixo; o relatório traz latências p50/p95/p99,
+vazão, erros por status e memória residente da API.
+
+Uso:
+    python -m benchmarks.load_test --levels 1,8,32 --duration 10
+    python -m benchmarks.load_test --model prebuilt-invoice --rate-limit 15 --endpoints 2
+"""
+import argparse
+import asyncio
+import base64
+import collections
+import contextlib
+import math
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import STUB_PORT, peak_rss_kb, rss_kb, run_api, run_stub
+
+# PNG 1x1; um sufixo por requisição evita cache e deduplicação
+SAMPLE_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Percentil pelo método nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+async def run_level(api_url: str, pid: int, concurrency: int, duration: float,
+                    model: str, raw_response: str, unique: bool, counter) -> Dict[str, float]:
+    latencies: List[float] = []
+    statuses: collections.Counter = collections.Counter()
+    peak_rss = 0
+
+    async def worker(client: httpx.AsyncClient, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            file_data = SAMPLE_PNG + next(counter).to_bytes(8, "big") if unique else SAMPLE_PNG
+            start = time.perf_counter()
+            response = await client.post("/analyze", json={
+                "file_data": base64.b64encode(file_data).decode(),
+                "file_type": "image",
+                "model": model,
+                "options": {"raw_response": raw_response}
+            })
+            elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                statuses[str(response.status_code)] += 1
+            elif not response.json().get("success"):
+                # 200 com success=False: falha do Azure após as retentativas
+                statuses["failed"] += 1
+            else:
+                statuses["ok"] += 1
+                latencies.append(elapsed)
+
+    async def sample_rss(stop: asyncio.Event) -> None:
+        nonlocal peak_rss
+        while not stop.is_set():
+            peak_rss = max(peak_rss, rss_kb(pid))
+            await asyncio.sleep(0.2)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=300, limits=limits) as client:
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_rss(stop))
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*[worker(client, deadline) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+
+    return {
+        "concurrency": concurrency,
+        "requests": sum(statuses.values()),
+        "ok": statuses["ok"],
+        "errors": {status: count for status, count in statuses.items() if status != "ok"},
+        "throughput": statuses["ok"] / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "rss_mb": peak_rss / 1024
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga do /analyze contra o stub")
+    parser.add_argument("--levels", default="1,8,32", help="Níveis de concorrência, ex.: 1,8,32")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos por nível")
+    parser.add_argument("--model", default="prebuilt-read")
+    parser.add_argument("--raw-response", default="none", choices=("full", "compact", "none"))
+    parser.add_argument("--latency", type=float, default=0.5, help="Latência do stub (s)")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--rate-limit", type=int, default=0, help="Submissões/s por stub antes de 429 (0 = ilimitado)")
+    parser.add_argument("--endpoints", type=int, default=1, help="Número de stubs (recursos do Azure)")
+    parser.add_argument("--repeat", action="store_true", help="Reenvia o mesmo documento (cache/deduplicação)")
+    parser.add_argument("--api-env", action="append", default=[], help="Variável da API, ex.: AZURE_RATE_LIMIT=0")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+    api_env = {"CACHE_ENABLED": "true" if args.repeat else "false"}
+    api_env.update(dict(item.split("=", 1) for item in args.api_env))
+
+    print("=" * 78)
+    print(f"🧪 Carga em {args.model}: níveis {levels}, {args.duration:.0f}s cada, "
+          f"{args.endpoints} stub(s) com latência {args.latency}s"
+          + (f" e limite de {args.rate_limit}/s" if args.rate_limit else ""))
+    print("=" * 78)
+
+    counter = iter(range(1 << 62))
+    with contextlib.ExitStack() as stack:
+        endpoints = [
+            stack.enter_context(run_stub(
+                latency=args.latency, pages=args.pages, port=STUB_PORT + index, rate_limit=args.rate_limit
+            ))
+            for index in range(args.endpoints)
+        ]
+        api_env["DI_ENDPOINTS"] = ",".join(endpoints)
+        api_url, process = stack.enter_context(run_api(endpoints[0], env=api_env))
+
+        print(f"{'conc.':>5} {'req':>6} {'ok':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'RSS':>8}  erros")
+        for concurrency in levels:
+            report = asyncio.run(run_level(
+                api_url, process.pid, concurrency, args.duration,
+                args.model, args.raw_response, not args.repeat, counter
+            ))
+            print(
+                f"{report['concurrency']:>5} {report['requests']:>6} {report['ok']:>6} "
+                f"{report['throughput']:>8.1f} {report['p50'] * 1000:>6.0f}ms {report['p95'] * 1000:>6.0f}ms "
+                f"{report['p99'] * 1000:>6.0f}ms {report['rss_mb']:>6.0f}MB  {report['errors'] or '-'}"
+            )
+        print(f"💾 Pico de RSS da API: {peak_rss_kb(process.pid) / 1024:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Documentos sintéticos (formato REST do AnalyzeResult) por modelo prebuilt,
+usados pelo stub: campos, tipos e aninhamentos como os do serviço real.
+"""
+from typing import Any, Dict, List
+
+
+def string(value: str, confidence: float = 0.98) -> Dict[str, Any]:
+    return {"type": "string", "valueString": value, "content": value, "confidence": confidence}
+
+
+def number(value: float, confidence: float = 0.97) -> Dict[str, Any]:
+    return {"type": "number", "valueNumber": value, "content": str(value), "confidence": confidence}
+
+
+def currency(amount: float, symbol: str = "R$", code: str = "BRL", confidence: float = 0.97) -> Dict[str, Any]:
+    return {
+        "type": "currency",
+        "valueCurrency": {"amount": amount, "currencySymbol": symbol, "currencyCode": code},
+        "content": f"{symbol} {amount:.2f}",
+        "confidence": confidence
+    }
+
+
+def date(value: str, confidence: float = 0.96) -> Dict[str, Any]:
+    return {"type": "date", "valueDate": value, "content": value, "confidence": confidence}
+
+
+def time_of_day(value: str, confidence: float = 0.95) -> Dict[str, Any]:
+    return {"type": "time", "valueTime": value, "content": value, "confidence": confidence}
+
+
+def phone(value: str, confidence: float = 0.95) -> Dict[str, Any]:
+    return {"type": "phoneNumber", "valuePhoneNumber": value, "content": value, "confidence": confidence}
+
+
+def address(street: str, city: str, state: str, postal_code: str, confidence: float = 0.94) -> Dict[str, Any]:
+    content = f"{street}, {city} - {state}, {postal_code}"
+    return {
+        "type": "address",
+        "valueAddress": {
+            "streetAddress": street,
+            "road": street,
+            "city": city,
+            "state": state,
+            "postalCode": postal_code,
+            "countryRegion": "BRA"
+        },
+        "content": content,
+        "confidence": confidence
+    }
+
+
+def array(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"type": "array", "valueArray": items}
+
+
+def obj(fields: Dict[str, Any], confidence: float = 0.95) -> Dict[str, Any]:
+    return {"type": "object", "valueObject": fields, "confidence": confidence}
+
+
+def receipt_document(items: int = 5) -> Dict[str, Any]:
+    line_items = [
+        obj({
+            "Description": string(f"Produto {index}"),
+            "Quantity": number(index),
+            "Price": currency(2.5 * index),
+            "TotalPrice": currency(2.5 * index * index)
+        })
+        for index in range(1, items + 1)
+    ]
+    subtotal = sum(2.5 * index * index for index in range(1, items + 1))
+    return {
+        "docType": "receipt.retailMeal",
+        "confidence": 0.98,
+        "fields": {
+            "MerchantName": string("Padaria Central"),
+            "MerchantAddress": address("Rua das Flores, 123", "São Paulo", "SP", "01000-000"),
+            "MerchantPhoneNumber": phone("+551130000000"),
+            "TransactionDate": date("2024-01-15"),
+            "TransactionTime": time_of_day("13:59:00"),
+            "Items": array(line_items),
+            "Subtotal": currency(subtotal),
+            "TotalTax": currency(round(subtotal * 0.1, 2)),
+            "Tip": currency(5.0),
+            "Total": currency(round(subtotal * 1.1 + 5.0, 2))
+        }
+    }
+
+
+def invoice_document(items: int = 10) -> Dict[str, Any]:
+    line_items = [
+        obj({
+            "Description": string(f"Serviço {index}"),
+            "ProductCode": string(f"SKU-{index:04d}"),
+            "Quantity": number(index),
+            "UnitPrice": currency(100.0),
+            "Amount": currency(100.0 * index)
+        })
+        for index in range(1, items + 1)
+    ]
+    subtotal = sum(100.0 * index for index in range(1, items + 1))
+    return {
+        "docType": "invoice",
+        "confidence": 0.97,
+        "fields": {
+            "VendorName": string("Contoso Ltda"),
+            "VendorAddress": address("Av. Paulista, 1000", "São Paulo", "SP", "01310-100"),
+            "CustomerName": string("Fabrikam S.A."),
+            "CustomerAddress": address("Rua XV de Novembro, 50", "Curitiba", "PR", "80020-310"),
+            "InvoiceId": string("INV-2024-0001"),
+            "InvoiceDate": date("2024-01-15"),
+            "DueDate": date("2024-02-15"),
+            "PurchaseOrder": string("PO-7788"),
+            "Items": array(line_items),
+            "SubTotal": currency(subtotal),
+            "TotalTax": currency(round(subtotal * 0.15, 2)),
+            "InvoiceTotal": currency(round(subtotal * 1.15, 2)),
+            "AmountDue": currency(round(subtotal * 1.15, 2))
+        }
+    }
+
+
+def business_card_document() -> Dict[str, Any]:
+    return {
+        "docType": "businessCard",
+        "confidence": 0.96,
+        "fields": {
+            "ContactNames": array([obj({"FirstName": string("Maria"), "LastName": string("Silva")})]),
+            "CompanyNames": array([string("Contoso Ltda")]),
+            "JobTitles": array([string("Diretora Financeira")]),
+            "Departments": array([string("Financeiro")]),
+            "Emails": array([string("maria.silva@contoso.com")]),
+            "Websites": array([string("https://contoso.com")]),
+            "MobilePhones": array([phone("+5511999990000")]),
+            "WorkPhones": array([phone("+551130000001")]),
+            "Addresses": array([address("Av. Paulista, 1000", "São Paulo", "SP", "01310-100")])
+        }
+    }
+
+
+def id_document() -> Dict[str, Any]:
+    return {
+        "docType": "idDocument.driverLicense",
+        "confidence": 0.95,
+        "fields": {
+            "FirstName": string("MARIA"),
+            "LastName": string("SILVA"),
+            "DocumentNumber": string("12345678900"),
+            "DateOfBirth": date("1985-06-20"),
+            "DateOfExpiration": date("2030-06-20"),
+            "Sex": string("F"),
+            "Address": address("Rua das Flores, 123", "São Paulo", "SP", "01000-000"),
+            "CountryRegion": {"type": "countryRegion", "valueCountryRegion": "BRA", "content": "BRASIL", "confidence": 0.99},
+            "Region": string("SP")
+        }
+    }
+
+
+DOCUMENT_BUILDERS = {
+    "prebuilt-receipt": receipt_document,
+    "prebuilt-invoice": invoice_document,
+    "prebuilt-businessCard": business_card_document,
+    "prebuilt-idDocument": id_document,
+}
+
+# Texto das páginas por tipo de conteúdo (STUB_CONTENT), usado pelo modelo auto
+PAGE_TEXT = {
+    "plain": "Linha {line} da pagina {page}",
+    "receipt": "Cupom fiscal item {line} subtotal troco pagina {page}",
+    "invoice": "Fatura item {line} vencimento nota fiscal pagina {page}",
+    "table": "{line} {page},00 {line}{page},50 1.234,00",
+}
+
+
+def build_documents(model: str) -> List[Dict[str, Any]]:
+    """Documentos extraídos pelo modelo (vazio para read/layout)"""
+    builder = DOCUMENT_BUILDERS.get(model)
+    if builder is None:
+        return []
+    document = builder()
+    document.setdefault("boundingRegions", [{"pageNumber": 1, "polygon": [0, 0, 8.5, 0, 8.5, 11, 0, 11]}])
+    document.setdefault("spans", [])
+    return [document]
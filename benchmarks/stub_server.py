@@ -0,0 +1,227 @@
+"""
+Servidor stub do Azure Document Intelligence para testes locais.
+
+Implementa o subconjunto da API REST usado pelo SDK azure-ai-formrecognizer:
+- POST {endpoint}/formrecognizer/documentModels/{model}:analyze
+- GET  {endpoint}/formrecognizer/documentModels/{model}/analyzeResults/{id}
+
+Para cada modelo prebuilt (recibo, fatura, cartão de visita, documento de
+identidade) o resultado traz um documento com campos sintéticos; acima de
+STUB_RATE_LIMIT submissões por segundo responde 429 com Retry-After, como
+um recurso com a cota esgotada.
+
+Uso:
+    python -m benchmarks.stub_server --port 9000 --latency 2
+    python -m benchmarks.stub_server --rate-limit 15
+"""
+import argparse
+import asyncio
+import collections
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from benchmarks.stub_payloads import PAGE_TEXT, build_documents
+
+API_VERSION = "2023-07-31"
+
+# Latência simulada de cada análise (segundos)
+LATENCY = float(os.getenv("STUB_LATENCY", "2"))
+# Número de páginas do resultado gerado
+PAGES = int(os.getenv("STUB_PAGES", "1"))
+# Gera uma tabela por página no resultado
+TABLES = os.getenv("STUB_TABLES", "true").lower() == "true"
+# Latência adicional por página analisada (segundos)
+PAGE_LATENCY = float(os.getenv("STUB_PAGE_LATENCY", "0"))
+# Banda de upload simulada em bytes/s (0 = ilimitada)
+BANDWIDTH = float(os.getenv("STUB_BANDWIDTH", "0"))
+# Submissões por segundo aceitas antes de responder 429 (0 = ilimitado)
+RATE_LIMIT = int(os.getenv("STUB_RATE_LIMIT", "0"))
+# Texto das páginas: plain, receipt, invoice ou table (padrão: conforme o modelo)
+CONTENT = os.getenv("STUB_CONTENT")
+
+app = FastAPI(title="Stub Azure Document Intelligence")
+
+# Operações em andamento: id -> (modelo, páginas, instante de conclusão)
+operations: Dict[str, Dict[str, Any]] = {}
+# Instantes das submissões aceitas no último segundo (limite de taxa)
+recent_submissions: collections.deque = collections.deque()
+
+
+def parse_pages(pages: Optional[str]) -> List[int]:
+    """Converte o parâmetro pages ("1-3,5") na lista de páginas do documento"""
+    if not pages:
+        return list(range(1, PAGES + 1))
+    numbers = []
+    for part in pages.split(","):
+        start, _, end = part.strip().partition("-")
+        numbers.extend(range(int(start), int(end or start) + 1))
+    return [number for number in numbers if number <= PAGES]
+
+
+def build_analyze_result(model: str, pages: Optional[int] = None,
+                         page_numbers: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Gera um AnalyzeResult (formato REST) com conteúdo sintético"""
+    if page_numbers is None:
+        page_numbers = list(range(1, (pages or PAGES) + 1))
+    result_pages = []
+    tables = []
+    content_parts = []
+    offset = 0
+    line_template = PAGE_TEXT[CONTENT or {
+        "prebuilt-receipt": "receipt",
+        "prebuilt-invoice": "invoice"
+    }.get(model, "plain")]
+
+    for page_number in page_numbers:
+        lines = []
+        words = []
+        page_offset = offset
+        for line_number in range(1, 31):
+            text = line_template.format(line=line_number, page=page_number)
+            word_offset = offset
+            for word in text.split(" "):
+                words.append({
+                    "content": word,
+                    "polygon": [1.0, 1.0, 1.5, 1.0, 1.5, 1.2, 1.0, 1.2],
+                    "confidence": 0.99,
+                    "span": {"offset": word_offset, "length": len(word)}
+                })
+                word_offset += len(word) + 1
+            lines.append({
+                "content": text,
+                "polygon": [1.0, 1.0, 5.0, 1.0, 5.0, 1.2, 1.0, 1.2],
+                "spans": [{"offset": offset, "length": len(text)}]
+            })
+            content_parts.append(text)
+            offset += len(text) + 1
+
+        result_pages.append({
+            "pageNumber": page_number,
+            "angle": 0,
+            "width": 8.5,
+            "height": 11,
+            "unit": "inch",
+            "words": words,
+            "lines": lines,
+            "spans": [{"offset": page_offset, "length": offset - page_offset}]
+        })
+
+        if TABLES:
+            cells = []
+            for row in range(10):
+                for column in range(5):
+                    cells.append({
+                        "kind": "columnHeader" if row == 0 else "content",
+                        "rowIndex": row,
+                        "columnIndex": column,
+                        "content": f"Coluna {column}" if row == 0 else f"{row * column},00",
+                        "boundingRegions": [{
+                            "pageNumber": page_number,
+                            "polygon": [1.0, 1.0, 2.0, 1.0, 2.0, 1.2, 1.0, 1.2]
+                        }],
+                        "spans": []
+                    })
+            tables.append({
+                "rowCount": 10,
+                "columnCount": 5,
+                "cells": cells,
+                "boundingRegions": [{
+                    "pageNumber": page_number,
+                    "polygon": [1.0, 1.0, 7.0, 1.0, 7.0, 5.0, 1.0, 5.0]
+                }],
+                "spans": []
+            })
+
+    return {
+        "apiVersion": API_VERSION,
+        "modelId": model,
+        "stringIndexType": "textElements",
+        "content": "\n".join(content_parts),
+        "pages": result_pages,
+        "tables": tables,
+        "documents": build_documents(model)
+    }
+
+
+@app.post("/formrecognizer/documentModels/{model_id}:analyze")
+async def begin_analyze(model_id: str, request: Request):
+    """Inicia uma operação de análise e retorna 202 com Operation-Location"""
+    if RATE_LIMIT > 0:
+        now = time.monotonic()
+        while recent_submissions and now - recent_submissions[0] >= 1:
+            recent_submissions.popleft()
+        if len(recent_submissions) >= RATE_LIMIT:
+            retry_after = 1 - (now - recent_submissions[0])
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": "1", "retry-after-ms": str(int(retry_after * 1000))},
+                content={"error": {
+                    "code": "429",
+                    "message": "Requests to the analyze operation have exceeded the rate limit of your current tier."
+                }}
+            )
+        recent_submissions.append(now)
+
+    body = await request.body()
+    if BANDWIDTH > 0:
+        await asyncio.sleep(len(body) / BANDWIDTH)
+
+    page_numbers = parse_pages(request.query_params.get("pages"))
+    operation_id = str(uuid.uuid4())
+    operations[operation_id] = {
+        "model": model_id,
+        "page_numbers": page_numbers,
+        "ready_at": time.monotonic() + LATENCY + PAGE_LATENCY * len(page_numbers)
+    }
+
+    location = (
+        f"{str(request.base_url).rstrip('/')}/formrecognizer/documentModels/"
+        f"{model_id}/analyzeResults/{operation_id}?api-version={API_VERSION}"
+    )
+    return Response(status_code=202, headers={"Operation-Location": location})
+
+
+@app.get("/formrecognizer/documentModels/{model_id}/analyzeResults/{operation_id}")
+async def get_analyze_result(model_id: str, operation_id: str):
+    """Retorna o status da operação (running/succeeded)"""
+    operation = operations.get(operation_id)
+    if operation is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": {"code": "NotFound", "message": "Operation not found"}}
+        )
+
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    if time.monotonic() < operation["ready_at"]:
+        return {"status": "running", "createdDateTime": now, "lastUpdatedDateTime": now}
+
+    operations.pop(operation_id, None)
+    return {
+        "status": "succeeded",
+        "createdDateTime": now,
+        "lastUpdatedDateTime": now,
+        "analyzeResult": build_analyze_result(operation["model"], page_numbers=operation["page_numbers"])
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub do Azure Document Intelligence")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=LATENCY)
+    parser.add_argument("--pages", type=int, default=PAGES)
+    parser.add_argument("--page-latency", type=float, default=PAGE_LATENCY)
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT)
+    args = parser.parse_args()
+
+    LATENCY = args.latency
+    PAGES = args.pages
+    PAGE_LATENCY = args.page_latency
+    RATE_LIMIT = args.rate_limit
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
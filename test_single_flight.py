@@ -0,0 +1,56 @@
+import asyncio
+import os
+
+# Os endpoints são montados a partir das credenciais; o cliente real é substituído abaixo
+os.environ.setdefault("DI_ENDPOINT", "http://localhost:9000")
+os.environ.setdefault("DI_KEY", "stub-key")
+
+from app.ocr_service import AzureOCRService
+
+class FakeResult:
+    """Resultado mínimo do Azure usado pelo serviço"""
+    content = ""
+    documents = []
+    pages = []
+    tables = []
+
+    def to_dict(self):
+        return {"model_id": "prebuilt-read"}
+
+class FakePoller:
+    async def result(self):
+        await asyncio.sleep(0.2)
+        return FakeResult()
+
+class FakeClient:
+    """Cliente stub que conta as chamadas ao Azure"""
+    def __init__(self):
+        self.calls = 0
+
+    async def begin_analyze_document(self, model, document, **kwargs):
+        self.calls += 1
+        return FakePoller()
+
+async def analyze_duplicates(service, count):
+    return await asyncio.gather(*[
+        service.analyze_document(b"mesmo documento", "prebuilt-read")
+        for _ in range(count)
+    ])
+
+def test_single_flight():
+    """K requisições idênticas simultâneas geram uma única chamada ao Azure"""
+    print("🔄 Testando deduplicação de requisições simultâneas...")
+    service = AzureOCRService()
+    service.cache = None
+    service.client = FakeClient()
+
+    results = asyncio.run(analyze_duplicates(service, 10))
+
+    print(f"Chamadas ao Azure: {service.client.calls}")
+    assert service.client.calls == 1
+    assert all(result["success"] for result in results)
+    assert not service._inflight
+    print("✅ Uma única chamada para 10 requisições")
+
+if __name__ == "__main__":
+    test_single_flight()